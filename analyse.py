@@ -0,0 +1,120 @@
+"""Fordelingar over skattelista, rekna éin gong per lasta liste."""
+from dataclasses import dataclass
+
+import numpy as np
+
+from skattemotor import MINSTE_SKATT, _avrund, skatt_urunda
+
+HISTOGRAM_BOTNAR = 40      # søyler i histogrammet over endring
+LORENZ_PUNKT = 101         # punkt på Lorenz-kurva, 0–100 % av eigarane
+AVRUNDING = 1              # kr; lista rundar ned, motoren rundar av, så ±1 kr tel som uendra
+
+
+@dataclass(frozen=True, eq=False)
+class Takstfordeling:
+    """Sorterte takstar for éin eigedomsklasse, og dei vanlegaste parametrane i klassen."""
+    takst: np.ndarray
+    skatteniva: float
+    bunnfradrag: float
+    promillesats: float
+    nytt_bunnfradrag: bool  # det vanlegaste frådraget er standardfrådraget
+
+    def kvantil(self, q):
+        """Kvantil (0–1) med lineær interpolasjon, som np.quantile, utan å sortere på nytt."""
+        q = np.asarray(q, dtype=float)
+        if len(self.takst) == 0:
+            return np.full(q.shape, np.nan)
+        pos = q * (len(self.takst) - 1)
+        lo = np.floor(pos).astype(int)
+        hi = np.minimum(lo + 1, len(self.takst) - 1)
+        return self.takst[lo] + (pos - lo) * (self.takst[hi] - self.takst[lo])
+
+
+def _vanlegast(a, standard):
+    if len(a) == 0:
+        return standard
+    verdiar, tal = np.unique(a, return_counts=True)
+    return float(verdiar[np.argmax(tal)])
+
+
+def takstfordelingar(eigedomar):
+    """Return {klasse: Takstfordeling} for kvar eigedomsklasse i lista."""
+    e = eigedomar
+    ut = {}
+    for i, (klasse, promille) in enumerate(zip(e.klassar, e.klassesatsar)):
+        maske = e.klasse == i
+        takst = np.sort(e.takst[maske])
+        takst.setflags(write=False)
+        bunnfradrag = _vanlegast(e.bunnfradrag[maske], 0.0)
+        ut[klasse] = Takstfordeling(
+            takst=takst,
+            skatteniva=_vanlegast(e.skatteniva[maske], 100.0),
+            bunnfradrag=bunnfradrag,
+            promillesats=float(promille),
+            nytt_bunnfradrag=bunnfradrag == e.std_bunnfradrag,
+        )
+    return ut
+
+
+@dataclass(frozen=True, eq=False)
+class Verknad:
+    """Korleis endringa i skatt fordeler seg over eigedomane utan fritak.
+
+    `kanter` og `tal` er histogrammet over ny minus dagens skatt i kr per år;
+    endringar utanfor 0,5–99,5-percentilen blir talde i ytterste søyle.
+    `lorenz` er delen av ny skatt som dei `lorenz_x` fattigaste eigarane
+    betaler, der eigarane er sorterte etter ny skatt.
+    """
+    kanter: np.ndarray
+    tal: np.ndarray
+    meir: int
+    mindre: int
+    uendra: int
+    under_minste: int
+    lorenz_x: np.ndarray
+    lorenz: np.ndarray
+    gini: float
+
+    @property
+    def antal(self):
+        return self.meir + self.mindre + self.uendra
+
+
+def verknad(eigedomar, skatt_dagens, politikk):
+    """Fordeling av endringa frå `skatt_dagens` til skatten med `politikk`."""
+    maske = eigedomar.utan_fritak
+    urunda = skatt_urunda(eigedomar, politikk)[maske]
+    ny = _avrund(urunda.copy())
+    endring = ny - skatt_dagens[maske]
+
+    lo, hi = np.percentile(endring, [0.5, 99.5]) if len(endring) else (0.0, 0.0)
+    if hi <= lo:
+        lo, hi = lo - 1, hi + 1
+    kanter = np.linspace(lo, hi, HISTOGRAM_BOTNAR + 1)
+    søyle = np.clip(np.searchsorted(kanter, endring, side="right") - 1, 0, HISTOGRAM_BOTNAR - 1)
+    tal = np.bincount(søyle, minlength=HISTOGRAM_BOTNAR)
+
+    # Lorenz-kurve og Gini over ny skatt
+    sortert = np.sort(ny).astype(float)
+    sum_ny = sortert.sum()
+    n = len(sortert)
+    lorenz_x = np.linspace(0, 1, LORENZ_PUNKT)
+    if n and sum_ny > 0:
+        kum = np.concatenate([[0.0], np.cumsum(sortert) / sum_ny])
+        lorenz = np.interp(lorenz_x * n, np.arange(n + 1), kum)
+        gini = float(2 * np.dot(np.arange(1, n + 1), sortert) / (n * sum_ny) - (n + 1) / n)
+    else:
+        lorenz, gini = lorenz_x.copy(), 0.0
+
+    return Verknad(
+        kanter=kanter,
+        tal=tal,
+        meir=int((endring > AVRUNDING).sum()),
+        mindre=int((endring < -AVRUNDING).sum()),
+        uendra=int((np.abs(endring) <= AVRUNDING).sum()),
+        # betalar i dag, har grunnlag etter ny politikk, men under minstegrensa
+        under_minste=int(((skatt_dagens[maske] > 0) & (urunda > 0) & (urunda < MINSTE_SKATT)).sum()),
+        lorenz_x=lorenz_x,
+        lorenz=lorenz,
+        gini=gini,
+    )
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""HTTP/JSON-API for kalkulatoren, utan Streamlit.
+
+Brukar same bufra skatteliste og skattemotor som app.py, så éin prosess
+kan svare mange skript. Berre standardbiblioteket blir brukt.
+
+    python api.py --port 8502
+
+    POST /berekn   {"bolig_sats": 1.8, "naering_sats": 4.0, "bunnfradrag_ny": 200000}
+    POST /berekn   {"politikkar": [{...}, {...}]}            # fleire i eitt kall
+    GET  /datasett
+    GET  /eksport?format=csv&bolig_sats=1.8&naering_sats=4.0&bunnfradrag_ny=200000
+
+Kvar politikk kan ha "datasett", "skatteniva", "per_eigedom": true,
+"satsar": {"verk_og_bruk": 7.0} for andre eigedomsklassar i datasettet, og
+"overstyringar": [{"eiendom": "1/88/0/0", "takst": 500000}], der takst,
+skatteniva og bunnfradrag kan overstyrast per eigedom. Satsar og
+botnfrådrag må vere innanfor grensene i framlegg.py og skattenivå mellom
+0 og 100; andre verdiar gir 400.
+
+/eksport sender ny skatt per eigedom som CSV, Parquet eller Excel (sjå
+eksport.py) med same ferdige fil for same datasett og politikk.
+"""
+import argparse
+import json
+import os
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from eksport import FORMAT, bitar, format_tilgjengelege, lag_fil
+from framlegg import MAKS_BOLIG, MAKS_BUNNFRADRAG, MAKS_SATS
+from skattedata import DATASETT, STANDARD_DATASETT, last_datasett
+from skattemotor import Politikk, skatt_per_eigedom
+
+MAKS_STORLEIK = 2**20   # byte i ein førespurnad
+MAKS_POLITIKKAR = 1000  # politikkar i eitt kall
+MAKS_TAKST = 1e12       # kr; overstyrt takst over dette er sikkert feil
+MAKS_SKATTENIVA = 100.0  # prosent
+# øvre grense per felt, så store tal ikkje flyt over i int64-summane
+OVERSTYRBARE = {"takst": MAKS_TAKST, "skatteniva": MAKS_SKATTENIVA, "bunnfradrag": MAKS_BUNNFRADRAG}
+
+
+class Feil(ValueError):
+    """Ugyldig førespurnad; meldinga blir sendt tilbake med status 400."""
+
+
+def _tal(spec, namn, maks):
+    verdi = spec.get(namn)
+    if isinstance(verdi, bool) or not isinstance(verdi, (int, float)) or not np.isfinite(verdi):
+        raise Feil(f"'{namn}' må vere eit tal")
+    if not 0 <= verdi <= maks:
+        raise Feil(f"'{namn}' må vere mellom 0 og {maks:g}")
+    return float(verdi)
+
+
+def _overstyr(skatteliste, overstyringar):
+    """Eigedomar med verdiane i `overstyringar`, slått opp på Eiendom."""
+    if not isinstance(overstyringar, list):
+        raise Feil("'overstyringar' må vere ei liste")
+    eiendom = skatteliste.df["Eiendom"].to_numpy(dtype=str)
+    e = skatteliste.eigedomar
+    for o in overstyringar:
+        if not isinstance(o, dict) or "eiendom" not in o:
+            raise Feil("kvar overstyring må ha 'eiendom'")
+        # ein eigedom kan ha fleire rader (t.d. bolig- og næringsdel)
+        rader = np.flatnonzero(eiendom == str(o["eiendom"]))
+        if len(rader) == 0:
+            raise Feil(f"fann ikkje eiendom {o['eiendom']}")
+        ukjende = set(o) - {"eiendom", *OVERSTYRBARE}
+        if ukjende:
+            raise Feil(f"kan ikkje overstyre {', '.join(sorted(ukjende))}")
+        e = e.overstyr(rader, **{k: _tal(o, k, maks) for k, maks in OVERSTYRBARE.items() if k in o})
+    return e
+
+
+def _satsar(skatteliste, satsar):
+    """((klasse, sats), ...) for andre klassar enn bolig og næring."""
+    if not isinstance(satsar, dict):
+        raise Feil("'satsar' må vere eit objekt")
+    klassar = set(skatteliste.eigedomar.klassar) - {"bolig", "naering"}
+    ukjende = set(satsar) - klassar
+    if ukjende:
+        raise Feil(f"ukjend eigedomsklasse {', '.join(sorted(ukjende))}")
+    return tuple(sorted((k, _tal(satsar, k, MAKS_SATS)) for k in satsar))
+
+
+def _politikk(spec, skatteliste):
+    return Politikk(
+        _tal(spec, "bolig_sats", MAKS_BOLIG),
+        _tal(spec, "naering_sats", MAKS_SATS),
+        _tal(spec, "bunnfradrag_ny", MAKS_BUNNFRADRAG),
+        _tal(spec, "skatteniva", MAKS_SKATTENIVA) if spec.get("skatteniva") is not None else None,
+        _satsar(skatteliste, spec.get("satsar") or {}),
+    )
+
+
+def _datasett(spec):
+    datasett_id = spec.get("datasett", STANDARD_DATASETT)
+    if not isinstance(datasett_id, str) or datasett_id not in DATASETT:
+        raise Feil(f"ukjend datasett {datasett_id!r}")
+    return datasett_id
+
+
+def eksport(query):
+    """(sti, format) for GET /eksport; talparametrane som i POST /berekn."""
+    spec = {k: v[-1] for k, v in parse_qs(query).items()}
+    format = spec.pop("format", "csv")
+    if format not in format_tilgjengelege():
+        raise Feil(f"format må vere eitt av {', '.join(format_tilgjengelege())}")
+    # andre klassar som satsar.<klasse>=sats
+    satsar = {k.removeprefix("satsar."): spec.pop(k) for k in list(spec) if k.startswith("satsar.")}
+    try:
+        spec = {k: v if k == "datasett" else float(v) for k, v in spec.items()}
+        satsar = {k: float(v) for k, v in satsar.items()}
+    except ValueError:
+        raise Feil("parametrane må vere tal") from None
+    datasett_id = _datasett(spec)
+    skatteliste = last_datasett(datasett_id)
+    return lag_fil(skatteliste, _politikk({**spec, "satsar": satsar}, skatteliste), format), format
+
+
+def berekn(spec):
+    """Rekn ut éin politikk frå JSON-spesifikasjonen `spec`; return svaret som dict."""
+    if not isinstance(spec, dict):
+        raise Feil("politikken må vere eit JSON-objekt")
+    datasett_id = _datasett(spec)
+    skatteliste = last_datasett(datasett_id)
+    politikk = _politikk(spec, skatteliste)
+    overstyringar = spec.get("overstyringar") or []
+    per_eigedom = bool(spec.get("per_eigedom"))
+
+    skatt_ny = None
+    # kuben har andre klassar på satsen i lista
+    if overstyringar or per_eigedom or politikk.skatteniva is not None or politikk.satsar:
+        skatt_ny = skatt_per_eigedom(_overstyr(skatteliste, overstyringar), politikk)
+        total = int(skatt_ny.sum())
+    else:
+        try:
+            total = skatteliste.inntektskube.total(politikk.bolig_sats, politikk.naering_sats,
+                                                   politikk.bunnfradrag)
+        except ValueError:  # utanfor rutenettet: rekn eksakt
+            total = int(skatt_per_eigedom(skatteliste.eigedomar, politikk).sum())
+
+    dagens = skatteliste.total_skatt_dagens
+    svar = {
+        "datasett": datasett_id,
+        "år": DATASETT[datasett_id].år,
+        "total_skatt": total,
+        "total_skatt_dagens": dagens,
+        "endring": total - dagens,
+    }
+    if per_eigedom:
+        df = skatteliste.df
+        svar["per_eigedom"] = [
+            {"eiendom": e, "adresse": a if isinstance(a, str) else "", "skatt": int(s), "skatt_ny": int(n)}
+            for e, a, s, n in zip(df["Eiendom"], df["Adresse"], df["Skatt"], skatt_ny)
+        ]
+    return svar
+
+
+def svar_på(body):
+    """Svar på ein POST /berekn med éin politikk eller {"politikkar": [...]}."""
+    if isinstance(body, dict) and "politikkar" in body:
+        politikkar = body["politikkar"]
+        if not isinstance(politikkar, list):
+            raise Feil("'politikkar' må vere ei liste")
+        if len(politikkar) > MAKS_POLITIKKAR:
+            raise Feil(f"maks {MAKS_POLITIKKAR} politikkar per kall")
+        return {"resultat": [berekn(p) for p in politikkar]}
+    return berekn(body)
+
+
+class Handlar(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # held sambandet ope mellom kall
+    disable_nagle_algorithm = True  # hovud og innhald blir skrivne kvar for seg
+    logg = True
+
+    def _send(self, status, data):
+        raw = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _køyr(self, handling):
+        """Køyr `handling`; Feil gir 400 og alle andre unntak 500, begge som JSON."""
+        self._sendt = False
+        try:
+            handling()
+        except Feil as e:
+            self._send(400, {"feil": str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # klienten har gått
+        except Exception:
+            self.log_error("intern feil i %s %s", self.command, self.path)
+            traceback.print_exc()
+            self.close_connection = True
+            if not self._sendt:
+                self._send(500, {"feil": "intern feil"})
+
+    def _lengd(self):
+        """Content-Length som int; Feil om han ikkje er eit ikkje-negativt heiltal."""
+        tekst = (self.headers.get("Content-Length") or "0").strip()
+        if not (tekst.isascii() and tekst.isdigit()):
+            # resten av førespurnaden kan ikkje lesast att, så sambandet blir stengt
+            self.close_connection = True
+            raise Feil("ugyldig Content-Length")
+        return int(tekst)
+
+    def do_GET(self):
+        self._køyr(self._get)
+
+    def _get(self):
+        adresse = urlsplit(self.path)
+        if adresse.path.rstrip("/") == "/datasett":
+            self._send(200, [{"id": d.id, "kommune": d.kommune, "år": d.år} for d in DATASETT.values()])
+        elif adresse.path.rstrip("/") == "/eksport":
+            sti, format = eksport(adresse.query)
+            self._send_fil(sti, *FORMAT[format])
+        else:
+            self._send(404, {"feil": "ukjend adresse"})
+
+    def _send_fil(self, sti, ending, mime):
+        # fila blir send i bitar frå disk, ikkje lesen inn heil; open fil kan ikkje ryddast vekk
+        with open(sti, "rb") as f:
+            self._sendt = True  # etter dette kan feil ikkje lenger bli eit JSON-svar
+            self.send_response(200)
+            self.send_header("Content-Type", mime)
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.send_header("Content-Disposition", f'attachment; filename="eigedomsskatt{ending}"')
+            self.end_headers()
+            for bit in bitar(f):
+                self.wfile.write(bit)
+
+    def do_POST(self):
+        self._køyr(self._post)
+
+    def _post(self):
+        if self.path.rstrip("/") != "/berekn":
+            self._send(404, {"feil": "ukjend adresse"})
+            return
+        lengd = self._lengd()
+        if lengd > MAKS_STORLEIK:
+            self.close_connection = True
+            self._send(413, {"feil": f"maks {MAKS_STORLEIK} byte"})
+            return
+        try:
+            body = json.loads(self.rfile.read(lengd) or b"null")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise Feil(f"ugyldig JSON: {e}") from None
+        self._send(200, svar_på(body))
+
+    def log_message(self, format, *args):
+        if self.logg:
+            super().log_message(format, *args)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8502)
+    args = ap.parse_args(argv)
+
+    last_datasett().inntektskube  # last lista og rutenettet før første kall
+    server = ThreadingHTTPServer((args.host, args.port), Handlar)
+    print(f"Lyttar på http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,66 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-import io
+
+# Berre det første visinga treng blir importert her; pandas, skattedata og
+# resten kjem etter første visning lenger nede (sjå oppstart.py).
+from datasett import DATASETT, STANDARD_DATASETT
+from framlegg import FASTE, KOMMUNEDIREKTOREN, PARAMETER, RAUDT, les_adresse, til_tekst
+from oppstart import last_oppstart
+from profil import profil, prometheus
+from skattemotor import BUNNFRADRAG, KLASSENAMN, MINSTE_SKATT, Politikk, skatt_per_eigedom, total_skatt
 
 st.set_page_config(page_title="Eigedomsskatt i Malvik", layout="wide")
-st.title("🏠 Eigedomsskatt i Malvik")
 
-# --- Les data ---
-URL = "https://raw.githubusercontent.com/jensmorten/malvikeskattkalkulator/refs/heads/main/data/skatteliste_clean_bunn.csv"
-
-def load_data(url):
-    return pd.read_csv(
-        url,
-        dtype=str,
-        sep=",",
-        engine="python",      # MER ROBUST
-        on_bad_lines="skip",  # HOPP OVER TOMME/STØY-LINJER
-        encoding="utf-8-sig"  # TAR HÅND OM BOM-FILER
+# Tidtaking per steg, berre med KALKULATOR_PROFIL=1 (sjå profil.py)
+prof = profil()
+
+# --- Val av kommune og år ---
+if "datasett" not in st.session_state:
+    st.session_state.datasett = STANDARD_DATASETT
+if len(DATASETT) > 1:
+    st.sidebar.selectbox(
+        "Kommune og år",
+        options=list(DATASETT),
+        format_func=lambda d: f"{DATASETT[d].kommune} {DATASETT[d].år}",
+        key="datasett"
     )
+datasett = DATASETT[st.session_state.datasett]
+år = datasett.år
 
-df=load_data(URL)
+st.title(f"🏠 Eigedomsskatt i {datasett.kommune}")
+
+# --- Les data ---
+# Første visning blir rekna frå oppstartsbiletet, som berre treng NumPy.
+# Utan bilete blir heile lista henta og konvertert no i staden; ho har same namn.
+with prof.steg("oppstart"):
+    første = last_oppstart(datasett)
+    if første is None:
+        from skattedata import last_datasett
+        første = last_datasett(datasett.id)
+    eigedomar = første.eigedomar
 
 st.markdown(
     f"""
 <div style="padding: 0.6em; border-radius: 5px; background-color: #e6ffed; border-left: 4px solid #00cc44;">
-<b></b> {len(df)} rader med data er lasta for 2025 ned frå Malvik kommune:
-<a href="https://www.malvik.kommune.no/nyhet/offentlig-ettersyn-eiendomsskatt-2025" target="_blank">
-Malvik kommune
+<b></b> {len(eigedomar)} rader med data er lasta for {år} ned frå {datasett.kommune} kommune:
+<a href="{datasett.nettside}" target="_blank">
+{datasett.kommune} kommune
 </a>
 </div>
 """,
     unsafe_allow_html=True
 )
-# --- Tvungen tallkonvertering ---
-for col in ["Takst", "Skattenivå", "Bunnfradrag", "Grunnlag", "Promillesats", "Skatt"]:
-    df[col] = (
-        df[col]
-        .astype(str)
-        .str.replace(" ", "")
-        .str.replace(",", ".")
-        .str.extract(r"([0-9\.]+)")        # hent kun tall og punktum
-        .fillna("0")
-        .astype(float)
-    )
+# Avvik i data blir fylt inn her når heile lista er lasta
+kvalitet = st.container()
 # --- Total skatt ---
-df["Fritak"] = df["Fritak"].astype(str).str.strip().str.lower()
-
-df_utan_fritak = df[df["Fritak"] == "ingen"]
+with prof.steg("total_dagens"):
+    total_skatt_utan_fritak = første.total_skatt_dagens
 
-total_skatt_utan_fritak = df_utan_fritak["Skatt"].sum()
+# Indeks for oppslag utanfor slider-rutenettet, bygd éin gong per lasta liste
+with prof.steg("grunnlagsindeks"):
+    grunnlagsindeks = første.grunnlagsindeks
 
-st.subheader("💰 Total eigedomsskatt (2025)")
+st.subheader(f"💰 Total eigedomsskatt ({år})")
 
 total_mill = round(total_skatt_utan_fritak / 1_000_000,1)
 st.metric(
@@ -66,14 +75,14 @@ st.metric(
 st.sidebar.header("⚙️ Justering av satsar")
 
 # --- Rødt sine foreslåtte verdier ---
-RODT_BOLIG = 2.9
-RODT_NAERING = 5.0
-RODT_BUNN = 1200000
+RODT_BOLIG = RAUDT.bolig_sats
+RODT_NAERING = RAUDT.naering_sats
+RODT_BUNN = RAUDT.bunnfradrag
 
 # --- Standard når av ---
-STD_BOLIG = 1.8
-STD_NAERING = 4.0
-STD_BUNN = 200000
+STD_BOLIG = KOMMUNEDIREKTOREN.bolig_sats
+STD_NAERING = KOMMUNEDIREKTOREN.naering_sats
+STD_BUNN = KOMMUNEDIREKTOREN.bunnfradrag
 
 # --- Init session states ---
 if "rodt_modus" not in st.session_state:
@@ -134,13 +143,13 @@ with st.sidebar:
 # Sliderne (alltid synlige)
 # -----------------------------------
 st.sidebar.slider(
-    "Promillesats for bolig (1.9‰ i 2025)",
+    f"Promillesats for bolig (1.9‰ i {år})",
     min_value=0.0, max_value=4.0, step=0.1,
     key="bolig_sats"
 )
 
 st.sidebar.slider(
-    "Promillesats for næring (4.0‰ i 2025)",
+    f"Promillesats for næring (4.0‰ i {år})",
     min_value=0.0, max_value=7.0, step=0.1,
     key="naering_sats"
 )
@@ -151,6 +160,18 @@ st.sidebar.slider(
     key="bunnfradrag_ny"
 )
 
+# Kommunar med fleire eigedomsklassar (t.d. verk og bruk) får ein slider per klasse
+andre_klassar = {k: float(s) for k, s in zip(eigedomar.klassar, eigedomar.klassesatsar)
+                 if k not in ("bolig", "naering")}
+for klasse, sats in andre_klassar.items():
+    if f"sats_{klasse}" not in st.session_state:
+        st.session_state[f"sats_{klasse}"] = sats
+    st.sidebar.slider(
+        f"Promillesats for {KLASSENAMN.get(klasse, klasse)} ({sats}‰ i {år})",
+        min_value=0.0, max_value=max(7.0, sats), step=0.1,
+        key=f"sats_{klasse}"
+    )
+
 # ============================
 #     OVERFØR SLIDER-VERDIAR
 # ============================
@@ -160,42 +181,26 @@ naering_sats = st.session_state.naering_sats
 bunnfradrag_ny = st.session_state.bunnfradrag_ny
 
 
-# --- Ny promillesats basert på type eiendom ---
-df["Promillesats_ny"] = df["Promillesats"]  # start med dagens sats
-
-# bolig: 1.9 ‰ → bruk bolig_sats
-df.loc[df["Promillesats"] == 1.9, "Promillesats_ny"] = bolig_sats
-df.loc[df["Bunnfradrag"] == 200000, "Bunnfradrag_ny"] = bunnfradrag_ny
-df.loc[df["Bunnfradrag"] != 200000, "Bunnfradrag_ny"] = df["Bunnfradrag"] 
-
-# næring: 4.0 ‰ → bruk næring_sats
-df.loc[df["Promillesats"] == 4.0, "Promillesats_ny"] = naering_sats
-
-# 1. takst * prosent
-df["Beregningsgrunnlag"] = df["Takst"] * (df["Skattenivå"] / 100)- df['Bunnfradrag']
-
-# 2. trekk frå nytt bunnfradrag
-df["Grunnlag_ny"] = df["Takst"] * (df["Skattenivå"] / 100) - df["Bunnfradrag_ny"]
-df["Grunnlag_ny"] = df["Grunnlag_ny"].clip(lower=0)
-
-# 3. ny promillesats (i promille → /1000)
-df["Skatt_ny"] = df["Grunnlag_ny"] * (df["Promillesats_ny"] / 1000)
-
-# 4. minimum 300-regel
-df.loc[df["Skatt_ny"] < 300, "Skatt_ny"] = 0
-
-# 5. Rund av til nærmaste krone
-df["Skatt_ny"] = (
-    df["Skatt_ny"]
-    .fillna(0)     # <- viktig
-    .replace([np.inf, -np.inf], 0)
-    .round(0)
-    .astype(int)
-)
+# berre klassar der sliderane er flytta frå satsen i lista
+andre_satsar = {k: st.session_state[f"sats_{k}"] for k, sats in andre_klassar.items()
+                if st.session_state[f"sats_{k}"] != sats}
+politikk = Politikk(bolig_sats, naering_sats, bunnfradrag_ny, satsar=tuple(sorted(andre_satsar.items())))
 
-total_skatt_ny = df["Skatt_ny"].sum()
+# --- Ny skatt (sjå skattemotor.py) ---
+# Alle slider-kombinasjonar er rekna ut på førehand, så dette er eit oppslag.
+# Andre verdiar går via grunnlagsindeksen (avrunda total, ikkje per eigedom).
+# Kuben har andre klassar på satsen i lista.
+with prof.steg("ny_skatt"):
+    kube = første.inntektskube
+    try:
+        if andre_satsar:
+            total_skatt_ny = round(grunnlagsindeks.total(bolig_sats, naering_sats, bunnfradrag_ny, andre_satsar))
+        else:
+            total_skatt_ny = kube.total(bolig_sats, naering_sats, bunnfradrag_ny)
+    except ValueError:
+        total_skatt_ny = round(grunnlagsindeks.total(bolig_sats, naering_sats, bunnfradrag_ny))
 
-st.subheader("🔮 Ny berekna eigedomsskatt (2026)")
+st.subheader(f"🔮 Ny berekna eigedomsskatt ({år + 1})")
 total_mill = round(total_skatt_ny / 1_000_000,1)
 st.metric(
     label="",
@@ -204,9 +209,10 @@ st.metric(
 
 
 text= "Basert på brukaren sine val for promillesats og botnfrådrag."
-if bolig_sats==1.8 and bunnfradrag_ny==200000:
+malvik_2026 = datasett.id == "malvik-2025"  # forslaga under gjeld berre Malvik-budsjettet for 2026
+if malvik_2026 and bolig_sats==1.8 and bunnfradrag_ny==200000:
     text = text + "Promillesats 1.8‰ og botnfrådrag 200 000 tilsvarar kommunedirektørens forslag for 2026 som skal behandlast i kommunestyret 8.12.2025"
-elif bolig_sats==2.9 and bunnfradrag_ny==1200000:
+elif malvik_2026 and bolig_sats==2.9 and bunnfradrag_ny==1200000:
     text = text + "Promillesats 2.9‰ og botnfrådrag 1 200 000 tilsvarar Raudts alternative budsjett for 2026. "
 
 st.caption(text)
@@ -223,101 +229,223 @@ else:
     
 st.markdown(f"### {tekst}")
 
-#st.subheader("🔍 Debug – topp 10 etter skatt")
-
-debug_cols = [
-    "Adresse",
-    "Eiendom",
-    "Takst",
-    "Skattenivå",
-    "Bunnfradrag",
-    "Grunnlag",
-    "Promillesats",
-    "Bunnfradrag_ny",
-    "Skatt",
-    "Promillesats_ny",
-    "Beregningsgrunnlag",
-    "Grunnlag_ny",
-    "Skatt_ny",
-]
-
-#st.dataframe(
-#    df.head(30)[debug_cols]
-#)
-
-
-p25 = 2500000 #df["Takst"].quantile(0.25)
-p50 = 4000000 #df["Takst"].quantile(0.50)
-p75 = 5500000 #df["Takst"].quantile(0.75)
-p99 = 10000000 ###3df["Takst"].quantile(0.985)
-
-
-def beregn_skatt(takst, skattenivå, bunnfradrag, promille):
-    grunnlag = takst * (skattenivå / 100) - bunnfradrag
-    grunnlag = max(grunnlag, 0)
-    skatt = grunnlag * (promille / 1000)
-    return 0 if skatt < 300 else skatt
-
-def to_mill(x):
-    return f"{x/1_000_000:.1f} mill."
-
+# ============================
+#   RESTEN: HEILE LISTA
+# ============================
+# Alt over er vist frå oppstartsbiletet. Her blir pandas og lista lasta;
+# med biletet deler lista tabellane og kuben med det, så ingenting blir rekna på nytt.
+import pandas as pd  # noqa: E402
+
+from eksport import FORMAT, format_tilgjengelege, lag_fil  # noqa: E402
+from skattedata import last_datasett  # noqa: E402
+from tabellar import (PERCENTIL_NAMN, STILLINGAR, TILTAK, farge_har_rad, farge_neg_pos, fargelegg,  # noqa: E402
+                      stillingar_rader, tiltak_rader, typiske_eigedomar)
+from usikkerheit import Scenario  # noqa: E402
+from validering import BIT, KONTROLLAR, tal_per_kontroll  # noqa: E402
+
+# Lista blir henta og konvertert første gong ho blir vald, og delt mellom øktene
+with prof.steg("last_data"):
+    skatteliste = last_datasett(datasett.id)
+    df = skatteliste.df
+
+# Kontrollane i validering.py er køyrde éin gong då lista vart konvertert
+if skatteliste.feil.any():
+    with kvalitet.expander(f"🧪 {int((skatteliste.feil != 0).sum())} rader har avvik i data"):
+        st.caption("Rader der tala ikkje heng saman eller ser ut til å vere feil tolka frå PDF-en. "
+                   "Dei er tekne med i utrekningane slik dei står i lista.")
+        for namn, n in tal_per_kontroll(skatteliste.feil).items():
+            st.write(f"- {KONTROLLAR[namn]}: {n} rader")
+        st.dataframe(skatteliste.feilrapport, hide_index=True)
+
+if st.checkbox("📊 Vis inntekt for alle kombinasjonar av promillesats og botnfrådrag"):
+    st.caption(f"Total skatt i mill. kr med promillesats for næring {naering_sats}‰. "
+               f"Den kvite lina viser inntekta i {år}, krysset dagens val.")
+    with prof.steg("inntektsflate"):
+        import matplotlib.pyplot as plt  # berre for denne figuren
+
+        flate = kube.flate(naering_sats) / 1_000_000
+        fig, ax = plt.subplots(figsize=(7, 4))
+        cs = ax.contourf(kube.bunnfradrag / 1_000_000, kube.bolig_satsar, flate, levels=20, cmap="RdYlGn_r")
+        ax.contour(kube.bunnfradrag / 1_000_000, kube.bolig_satsar, flate,
+                   levels=[total_skatt_utan_fritak / 1_000_000], colors="white", linewidths=2)
+        ax.plot(bunnfradrag_ny / 1_000_000, bolig_sats, "kx", markersize=10)
+        ax.set_xlabel("Botnfrådrag (mill. kr)")
+        ax.set_ylabel("Promillesats bolig (‰)")
+        fig.colorbar(cs, ax=ax, label="mill. kr")
+        st.pyplot(fig)
+        plt.close(fig)
+
+    noytral, noytral_total = kube.noytralt_bunnfradrag(bolig_sats, naering_sats, total_skatt_utan_fritak)
+    st.write(f"Med {bolig_sats}‰ for bolig gir eit botnfrådrag på **{noytral:,.0f} kr** "
+             f"inntekt nærast {år}-nivået ({noytral_total / 1_000_000:.1f} mill. kr).")
+
+if st.checkbox("🎯 Finn promillesats eller botnfrådrag for eit inntektsmål"):
+    kol_mål, kol_ukjend = st.columns(2)
+    mål_mill = kol_mål.number_input(
+        "Inntektsmål (mill. kr)", min_value=0.0, step=0.5,
+        value=round(total_skatt_utan_fritak / 1_000_000, 1)
+    )
+    ukjend = kol_ukjend.radio(
+        "Finn", ["bolig_sats", "bunnfradrag"],
+        format_func={"bolig_sats": "Promillesats bolig", "bunnfradrag": "Botnfrådrag"}.get,
+        horizontal=True
+    )
+    mål = mål_mill * 1_000_000
 
-rows = []
+    # Bisection på grunnlagsindeksen; heile kurva blir løyst i same halveringar
+    with prof.steg("inntektsmål"):
+        if ukjend == "bolig_sats":
+            svar = grunnlagsindeks.bolig_sats_for(mål, naering_sats, bunnfradrag_ny, andre_satsar)
+            mål_politikk = Politikk(svar, naering_sats, bunnfradrag_ny, satsar=politikk.satsar)
+        else:
+            svar = grunnlagsindeks.bunnfradrag_for(mål, bolig_sats, naering_sats, andre_satsar)
+            mål_politikk = Politikk(bolig_sats, naering_sats, svar, satsar=politikk.satsar)
+        kurve = grunnlagsindeks.bolig_sats_for(mål, naering_sats, BUNNFRADRAG, andre_satsar)
 
-for label, takst in [("Eigedom med låg takst (~0.25-percentil)", p25),
-                     ("Eigedom med median takst (~0.5-percentil)", p50),
-                     ("Eigedom med høg takst, (~0.75-percentil)", p75),
-                     ("Eigedom med svært høg takst (~0.99-percentil)", p99)]:
+    if np.isnan(svar):
+        st.write("Målet kan ikkje nåast innanfor sliderane med dei andre vala.")
+    else:
+        mål_total = total_skatt(skatteliste.eigedomar, mål_politikk)
+        if ukjend == "bolig_sats":
+            st.write(f"Med botnfrådrag {bunnfradrag_ny:,.0f} kr trengst ein promillesats for bolig på "
+                     f"minst **{svar:.3f}‰** ({mål_total / 1_000_000:.2f} mill. kr).")
+        else:
+            st.write(f"Med {bolig_sats}‰ for bolig kan botnfrådraget vere opp til "
+                     f"**{svar:,.0f} kr** ({mål_total / 1_000_000:.2f} mill. kr).")
+    st.caption(f"Kombinasjonar av botnfrådrag og promillesats for bolig som gir {mål_mill} mill. kr "
+               f"med {naering_sats}‰ for næring.")
+    st.line_chart(
+        pd.DataFrame({"Botnfrådrag (kr)": BUNNFRADRAG, "Promillesats bolig (‰)": kurve}),
+        x="Botnfrådrag (kr)", y="Promillesats bolig (‰)"
+    )
 
-    # dagens satser
-    skatt_dagens = beregn_skatt(
-        takst=takst,
-        skattenivå=70,   # *antatt lik for alle*
-        bunnfradrag=200000, # *typisk 0 eller 200k*
-        promille=1.9    # blir ≈ 1.9
+if st.checkbox("🎲 Vis usikkerheit i ny total"):
+    st.caption("Monte Carlo-simulering: takstane blir omtakserte tilfeldig, rader som ikkje kunne tolkast "
+               "frå PDF-en kan vere bustader, og delvis fritak tek ein tilfeldig del av grunnlaget.")
+    kol1, kol2 = st.columns(2)
+    omtaksering = kol1.slider("Forventa omtaksering (%)", -20, 40, 0, step=5)
+    omtaksering_sd = kol1.slider("Usikkerheit i omtakseringa (%)", 0, 10, 2)
+    individ_sd = kol1.slider("Spreiing per eigedom (%)", 0, 30, 10, step=5)
+    p_mistenkt = kol2.slider(f"Sannsyn for at dei {int(skatteliste.mistenkte.sum())} feil tolka radene er bustader",
+                             0.0, 1.0, 0.5, step=0.1)
+    delvis_lo, delvis_hi = kol2.slider(f"Friteke del av grunnlaget for {int(skatteliste.delvis_fritak.sum())} "
+                                       "eigedomar med delvis fritak (%)", 0, 100, (0, 100), step=5)
+    scenario = Scenario(omtaksering / 100, omtaksering_sd / 100, individ_sd / 100, p_mistenkt,
+                        (delvis_lo / 100, delvis_hi / 100))
+
+    with prof.steg("usikkerheit"):
+        simulering = skatteliste.usikkerheit(politikk, scenario)
+    lo, hi = simulering.intervall(0.95)
+    kol1, kol2, kol3 = st.columns(3)
+    kol1.metric("Median", f"{simulering.median / 1_000_000:.1f} mill. kr")
+    kol2.metric("95 % intervall", f"{lo / 1_000_000:.1f}–{hi / 1_000_000:.1f} mill. kr")
+    kol3.metric(f"Sannsyn for meir enn i {år}", f"{simulering.del_over(total_skatt_utan_fritak):.0%}")
+    st.bar_chart(
+        pd.Series(simulering.totalar / 1_000_000).round(1).value_counts().sort_index()
+        .rename_axis("Total (mill. kr)").rename("Replikaer").reset_index(),
+        x="Total (mill. kr)", y="Replikaer"
     )
 
-    # nye satser (basert på sliderne)
-    skatt_ny = beregn_skatt(
-        takst=takst,
-        skattenivå=70,
-        bunnfradrag=bunnfradrag_ny,
-        promille=bolig_sats  # persentil = bolig
+if st.checkbox("👥 Vis kven som betaler meir og kven som betaler mindre"):
+    with prof.steg("verknad"):
+        verknad = skatteliste.verknad(politikk)
+    st.caption(f"Ny skatt minus skatt i {år} for dei {verknad.antal:,} eigedomane utan fritak. "
+               "Endringar på 1 kr eller mindre skuldast avrunding og er rekna som uendra.")
+
+    kol1, kol2, kol3, kol4 = st.columns(4)
+    kol1.metric("Betaler meir", f"{verknad.meir / verknad.antal:.0%}")
+    kol2.metric("Betaler mindre", f"{verknad.mindre / verknad.antal:.0%}")
+    kol3.metric(f"Under {MINSTE_SKATT} kr", f"{verknad.under_minste:,}",
+                help="Eigedomar som betaler i dag, men der ny skatt blir under minstegrensa og fell bort")
+    kol4.metric("Gini (ny skatt)", f"{verknad.gini:.2f}")
+
+    midt = (verknad.kanter[:-1] + verknad.kanter[1:]) / 2
+    st.bar_chart(
+        pd.DataFrame({"Endring per år (kr)": midt.round(), "Eigedomar": verknad.tal}),
+        x="Endring per år (kr)", y="Eigedomar"
+    )
+    st.line_chart(
+        pd.DataFrame({
+            "Del av eigarane": verknad.lorenz_x,
+            "Del av ny skatt": verknad.lorenz,
+            "Lik fordeling": verknad.lorenz_x,
+        }),
+        x="Del av eigarane", y=["Del av ny skatt", "Lik fordeling"]
     )
 
-    eom=(skatt_ny-skatt_dagens)/12
+def to_mill(x):
+    return f"{x/1_000_000:.1f} mill."
 
-    rows.append({
-        "Takst-nivå": label,
-        "Takst": f"{takst:,.0f} kr",
-        "Skatt (dagens)": f"{skatt_dagens:,.0f} kr",
-        "Skatt (ny)":  f"{skatt_ny:,.0f} kr",
-        "Mogleg endring per mnd":  f"{eom:,.0f} kr"
-        })
-    
-    
+
+st.subheader("⚖️ Samanlikn framlegg")
+st.caption("Framlegga i adressa blir vist her, så lenkja kan delast. "
+           "Resultata blir bufra på tenaren og delte mellom alle som opnar same lenkje.")
+
+# Faste framlegg, dei frå adressa og sliderane no
+frå_adressa, adressefeil = les_adresse(st.query_params.get_all(PARAMETER))
+for melding in adressefeil:
+    st.warning(f"Hoppa over {melding}.")
+alle_framlegg = {**FASTE, **frå_adressa, "Ditt val": politikk}
+valde = st.multiselect(
+    "Framlegg", options=list(alle_framlegg),
+    default=list(frå_adressa) or ["Kommunedirektøren", "Raudt", "Ditt val"]
+)
+
+kol_namn, kol_lagre = st.columns([3, 1])
+namn_ditt = kol_namn.text_input("Namn på ditt val", value="", placeholder="t.d. Mitt framlegg")
+if kol_lagre.button("Legg til i lenkja", disabled=not namn_ditt.strip()):
+    # held også dei andre framlegga frå adressa, men eitt per namn
+    nye = {**frå_adressa, namn_ditt.strip(): politikk}
+    st.query_params[PARAMETER] = [til_tekst(n, p) for n, p in nye.items()]
+    st.rerun()
+
+if valde:
+    with prof.steg("samanlikning"):
+        resultat = {namn: skatteliste.resultat(alle_framlegg[namn]) for namn in valde}
+    for kol, (namn, res) in zip(st.columns(len(valde)), resultat.items()):
+        p = alle_framlegg[namn]
+        kol.metric(namn, f"{res.total / 1_000_000:.1f} mill. kr",
+                   delta=f"{res.endring / 1_000_000:+.1f} mill. kr")
+        kol.caption(f"{p.bolig_sats:g}‰ bolig, {p.naering_sats:g}‰ næring, "
+                    f"botnfrådrag {p.bunnfradrag:,.0f} kr")
+    df_samanlikning = pd.DataFrame({
+        namn: {
+            "Total (kr)": res.total,
+            "Endring frå i dag (kr)": res.endring,
+            "Betaler meir": res.meir,
+            "Betaler mindre": res.mindre,
+            "Median endring per eigedom (kr)": round(res.median_endring),
+            **{f"Frå {KLASSENAMN.get(k, k)} (kr)": v for k, v in res.per_klasse.items()},
+        }
+        for namn, res in resultat.items()
+    })
+    st.dataframe(df_samanlikning.style.format("{:,.0f}"))
+
+if PARAMETER in st.query_params:
+    st.caption("Del lenkja i adressefeltet for å vise same framlegg til andre.")
 
 st.subheader("📘 Kostnad for typiske eigedomar")
 
-df_sim = pd.DataFrame(rows)
+kol_klasse, kol_pct = st.columns([1, 3])
+klasse = kol_klasse.radio(
+    "Eigedomstype", list(skatteliste.takstfordelingar),
+    format_func=lambda k: KLASSENAMN.get(k, k).capitalize(),
+    horizontal=True
+)
+percentilar = kol_pct.multiselect(
+    "Percentilar", options=list(range(1, 100)), default=list(PERCENTIL_NAMN)
+)
 
-def farge_neg_pos(val):
-    try:
-        clean = float(val.replace(" kr", "").replace(",", "").replace(" ", ""))
-    except:
-        return ""
-    if clean < 0:
-        return "background-color: #e6ffe6;"   # grøn
-    elif clean > 0:
-        return "background-color: #ffe6e6;"   # raud
-    return ""
+with prof.steg("typiske"):
+    fordeling = skatteliste.takstfordelingar[klasse]
+    sats_ny = dict(zip(eigedomar.klassar, politikk.satstabell(eigedomar.klassar, eigedomar.klassesatsar)))[klasse]
+    rows = typiske_eigedomar(fordeling, percentilar, sats_ny, bunnfradrag_ny)
 
+df_sim = pd.DataFrame(rows, columns=["Takst-nivå", "Takst", "Skatt (dagens)", "Skatt (ny)", "Mogleg endring per mnd"])
 
 df_sim_styled = (
-    df_sim
-    .style
     # farge på endring
-    .applymap(farge_neg_pos, subset=["Mogleg endring per mnd"])
+    fargelegg(df_sim, farge_neg_pos, "Mogleg endring per mnd")
     # generelt utseende
     #.set_properties(**{
     #    "font-size": "26px",     # større skrift
@@ -338,40 +466,71 @@ df_sim_styled = (
     #])
 )
 
-st.dataframe(df_sim_styled, hide_index=True, use_container_width=False)
-
-
-tiltak = {
-    "Gjenninføre gratis folkebad i Hommelvik": 240000,
-    "Fortsette å holde barnetrygd utenfor beregning av sosialhjelp dersom regjeringa ikke snur": 1000000,
-    "Fortsette å ha gratis tryggheitsalarm for personer med inntekt under 2G": 400000,
-    "Oppretthalde vidareutdanning lærarar": 1000000,
-    "Arbeidsklær til tilsette i barnehage/SFO": 1700000,
-    "Redusert kulturskolepris": 400000,
-    "Halv husleie kommunale boliger juli og desember": 200000,
-    "Stoppe tvangssalg ved kommunale gebyrer": 100000
-}
-
-stillinger = {
-    "Lærar": 787200,
-    "Barnehagelærar": 787200,
-    "Lektor": 880500,
-    "Spesialpedagog": 880000,
-    "Fagarbeidar": 705000,
-    "Assistent": 605500,
-    "Kjøkkenassistent (fagbrev)": 705000,
-    "Kjøkkenassistent": 605500,
-    "Sjukepleiar": 850000,
-    "Hjelpepleiar": 750000,
-}
-
-def farge_har_rad(val):
-    if isinstance(val, str):
-        if val.startswith("ja"):
-            return "background-color: #e5ffe5;"   # grøn
-        elif val == "nei":
-            return "background-color: #ffe5e5;"   # raud
-    return ""
+with prof.steg("typiske_vis"):
+    st.dataframe(df_sim_styled, hide_index=True, use_container_width=False)
+
+
+st.subheader("🔎 Finn eigedomen din")
+
+sok_tekst = st.text_input("Adresse eller gnr/bnr", placeholder="t.d. Vidsjåvegen 10 eller 1/6")
+
+if sok_tekst:
+    with prof.steg("eigedomssok"):
+        treff = skatteliste.eigedomssok.sok(sok_tekst)
+    if not treff:
+        st.write("Fann ingen eigedom som passar til søket.")
+    else:
+        def namn_rad(i):
+            adresse = df["Adresse"].iat[i]
+            adresse = adresse if isinstance(adresse, str) and adresse else "(utan adresse)"
+            return f"{adresse} ({df['Eiendom'].iat[i]})"
+
+        rad = st.selectbox("Treff", treff, format_func=namn_rad)
+        skatt_dagens = float(df["Skatt"].iat[rad])
+        skatt_ny_rad = int(skatt_per_eigedom(skatteliste.eigedomar, politikk)[rad])
+        eom = (skatt_ny_rad - skatt_dagens) / 12
+
+        df_eigedom = pd.DataFrame([{
+            "Eigedom": namn_rad(rad),
+            "Takst": f"{df['Takst'].iat[rad]:,.0f} kr",
+            "Skatt (dagens)": f"{skatt_dagens:,.0f} kr",
+            "Skatt (ny)": f"{skatt_ny_rad:,.0f} kr",
+            "Mogleg endring per mnd": f"{eom:,.0f} kr"
+        }])
+        st.dataframe(
+            fargelegg(df_eigedom, farge_neg_pos, "Mogleg endring per mnd"),
+            hide_index=True, use_container_width=False
+        )
+        if skatteliste.feil[rad]:
+            avvik = [tekst for namn, tekst in KONTROLLAR.items() if skatteliste.feil[rad] & BIT[namn]]
+            st.caption(f"Merk: rada for eigedomen har avvik i data ({'; '.join(avvik)}), "
+                       "så tala kan vere feil.")
+        fritak = df["Fritak"].iat[rad]
+        if fritak != "ingen":
+            st.caption(f"Merk: eigedomen er registrert med fritak ({fritak}). "
+                       "Kalkulatoren tek ikkje omsyn til delvis fritak.")
+
+# --- Eksport av heile lista med ny skatt (sjå eksport.py) ---
+with st.expander("⬇️ Last ned ny skatt for alle eigedomar"):
+    st.caption("Fila har dagens og ny skatt per eigedom med satsane som er valde no. "
+               "Ho blir laga éin gong per politikk og delt mellom alle som lastar ned.")
+    kol_format, kol_lag = st.columns([3, 1])
+    format_eksport = kol_format.radio(
+        "Format", format_tilgjengelege(),
+        format_func={"csv": "CSV", "parquet": "Parquet", "xlsx": "Excel med samandrag"}.get,
+        horizontal=True
+    )
+    # fila blir berre laga når nokon ber om ho, ikkje ved kvar endring av sliderane
+    eksport_nøkkel = (datasett.id, politikk, format_eksport)
+    if kol_lag.button("Lag fil"):
+        st.session_state.eksport = eksport_nøkkel
+    if st.session_state.get("eksport") == eksport_nøkkel:
+        with prof.steg("eksport"), st.spinner("Lagar fila ..."):
+            sti = lag_fil(skatteliste, politikk, format_eksport)  # ferdig fil om ho finst
+        ending, mime = FORMAT[format_eksport]
+        with open(sti, "rb") as f:
+            st.download_button("Last ned", f, file_name=f"eigedomsskatt_{datasett.id}{ending}", mime=mime)
+
 
 if inntekt_diff_mill > 0:
 
@@ -385,46 +544,36 @@ if inntekt_diff_mill > 0:
     # ----------------------
     st.markdown("### 🟩 Ekstra ting vi har råd til:")
 
-    remaining = inntekt_diff_kr
-    rows_tiltak = []
-
-    for namn, kostnad in tiltak.items():
-        if kostnad == 0:
-            kan = "ja (gratis)"
-        elif kostnad <= remaining:
-            kan = "ja"
-            remaining -= kostnad
-        else:
-            kan = "nei"
-
-        rows_tiltak.append({
-        "Tiltak": namn,
-        "Kostnad": f"{kostnad:,.0f} kr",
-        "Har råd": kan,
-        "Gjenværende budsjett": f"{remaining:,.0f} kr"
-        })
-
+    # Beste plan etter prioritet, ikkje berre tiltaka i rekkjefølgje (sjå budsjett.py)
+    with st.expander("⚖️ Prioriter tiltak og stillingar"):
+        st.caption("Planen med høgast samla prioritet blir vald. Stillingar blir rekna i heile årsverk. "
+                   "Prioritet 0 betyr at posten ikkje blir teken med.")
+        df_prioritet = st.data_editor(
+            pd.DataFrame({
+                "Post": list(TILTAK) + list(STILLINGAR),
+                "Type": ["Tiltak"] * len(TILTAK) + ["Årsverk"] * len(STILLINGAR),
+                "Prioritet": [1] * len(TILTAK) + [0] * len(STILLINGAR),
+            }),
+            column_config={"Prioritet": st.column_config.NumberColumn(min_value=0, max_value=10, step=1)},
+            disabled=["Post", "Type"],
+            hide_index=True,
+            key="prioritet"
+        )
+    prioritet = dict(zip(df_prioritet["Post"], df_prioritet["Prioritet"].fillna(0).astype(int)))
+
+    with prof.steg("tiltak"):
+        rows_tiltak = tiltak_rader(inntekt_diff_kr, prioritet=prioritet)
 
     df_tiltak = pd.DataFrame(rows_tiltak)
-    df_tiltak_styled = (
-        df_tiltak
-            .style
-            .applymap(farge_har_rad, subset=["Har råd"])
-    )
-    st.dataframe(df_tiltak_styled, hide_index=True, use_container_width=False)
+    df_tiltak_styled = fargelegg(df_tiltak, farge_har_rad, "Har råd")
+    with prof.steg("tiltak_vis"):
+        st.dataframe(df_tiltak_styled, hide_index=True, use_container_width=False)
     # ----------------------
     # Kor mange stillingar
     # ----------------------
     st.markdown("### 👩‍🏫 Eller hva med ekstra bemanning?")
 
-    rows_stilling = []
-    for kategori, løn in stillinger.items():
-        antal = inntekt_diff_kr / løn
-        rows_stilling.append({
-            "Stilling": kategori,
-            "Årskostnad": f"{løn:,.0f} kr",
-            "Tal mogleg årsverk": round(antal, 1)
-        })
+    rows_stilling = stillingar_rader(inntekt_diff_kr)
 
     st.dataframe(pd.DataFrame(rows_stilling), hide_index=True, use_container_width=False)
 
@@ -449,4 +598,34 @@ Ta gjerne kontakt med <a href="mailto:jens.morten.nilsen@gmail.com">jens.morten.
 Utviklaren er kommunestyrerepresentant for Raudt i Malvik men vil undertreke at kalkulatoren kan brukast av alle, 
 og den reknar like bra utansett som skatten går opp eller ned. 
 </p>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# ============================
+#     PROFILERING (KALKULATOR_PROFIL=1)
+# ============================
+
+if prof.aktiv:
+    prof.avslutt()
+    with st.sidebar.expander("⏱️ Profilering av denne køyringa", expanded=True):
+        st.caption(f"Total {prof.total * 1000:.0f} ms. "
+                   + ("Minnetal frå tracemalloc." if prof.minne
+                      else "Ingen minnetal: ei anna økt vart profilert samstundes."))
+        st.dataframe(
+            pd.DataFrame([{
+                "Steg": m.namn,
+                "Tid (ms)": round(m.sekund * 1000, 1),
+                "Netto (KB)": round(m.netto / 1024) if m.netto is not None else None,
+                "Topp (KB)": round(m.topp / 1024) if m.topp is not None else None,
+            } for m in prof.målingar]),
+            hide_index=True
+        )
+        st.download_button("Last ned Prometheus-metrikkar", prometheus(),
+                           file_name="metrics.txt", mime="text/plain")
+
+        st.caption("Topp 30 rader med ny skatt")
+        debug_cols = ["Adresse", "Eiendom", "Takst", "Skattenivå", "Bunnfradrag",
+                      "Grunnlag", "Promillesats", "Skatt", "Skatt_ny"]
+        st.dataframe(
+            df.assign(Skatt_ny=skatt_per_eigedom(skatteliste.eigedomar, politikk)).head(30)[debug_cols],
+            hide_index=True
+        )
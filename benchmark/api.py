@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Førespurnader per sekund mot api.py med fleire samtidige klientar.
+
+Startar API-et i same prosess på ein ledig port og lèt kvar klient sende
+POST /berekn over eitt ope samband. Tre typar last blir målte: oppslag i
+rutenettet, eksakt berekning utanfor rutenettet og 100 politikkar i eitt
+kall.
+
+    python benchmark/api.py                       # 1, 4 og 16 klientar
+    python benchmark/api.py --klientar 8 -n 500   # valfri last
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import api  # noqa: E402
+from skattedata import last_datasett  # noqa: E402
+
+LAST = {
+    "rutenett": {"bolig_sats": 1.8, "naering_sats": 4.0, "bunnfradrag_ny": 200000},
+    "eksakt": {"bolig_sats": 1.85, "naering_sats": 4.0, "bunnfradrag_ny": 250000},
+    "100 i kall": {"politikkar": [{"bolig_sats": i / 25, "naering_sats": 4.0, "bunnfradrag_ny": 200000}
+                                  for i in range(100)]},
+}
+
+
+def klient(port, body, n):
+    """Send `n` førespurnader over eitt samband; return svartider i sekund."""
+    raw = json.dumps(body).encode()
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    tider = []
+    try:
+        for _ in range(n):
+            t = time.perf_counter()
+            conn.request("POST", "/berekn", raw, {"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                raise RuntimeError(f"status {resp.status}")
+            tider.append(time.perf_counter() - t)
+    finally:
+        conn.close()
+    return tider
+
+
+def mål(port, body, klientar, n):
+    """Return (førespurnader per sekund, median ms, p99 ms)."""
+    t = time.perf_counter()
+    with ThreadPoolExecutor(klientar) as pool:
+        tider = sorted(x for ts in pool.map(lambda _: klient(port, body, n), range(klientar)) for x in ts)
+    sekund = time.perf_counter() - t
+    return len(tider) / sekund, tider[len(tider) // 2] * 1000, tider[int(len(tider) * 0.99)] * 1000
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--klientar", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("-n", type=int, default=200, help="førespurnader per klient")
+    args = ap.parse_args(argv)
+
+    last_datasett().inntektskube  # ikkje mål første lasting
+    api.Handlar.logg = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), api.Handlar)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    print(f"{'last':>12} {'klientar':>9} {'per sek':>9} {'median':>9} {'p99':>9}")
+    try:
+        for namn, body in LAST.items():
+            for k in args.klientar:
+                rps, median, p99 = mål(port, body, k, args.n)
+                print(f"{namn:>12} {k:>9} {rps:>9.0f} {median:>6.2f} ms {p99:>6.2f} ms")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Samanlikning med grunnlinje.json, felles for kalkulator.py og oppstart.py.
+
+Tidene i grunnlinja er målte på éi maskin. Difor blir tida for ei fast
+kalibreringssløyfe målt rett etter kvart steg og lagra saman med tida for
+steget, og grunnlinja blir skalert med forholdet mellom kalibreringa no og
+då. Slik følgjer skaleringa både ei anna maskin og ei maskin som er tregare
+ei stund fordi andre prosessar køyrer. Eit steg blir berre flagga når det
+er meir enn `toleranse` tregare og minst MIN_DELTA sekund tregare, så små
+steg ikkje blir flagga for støy.
+"""
+import json
+import time
+
+import numpy as np
+
+MIN_DELTA = 0.010   # sekund; mindre skilnader blir aldri flagga
+
+
+def _sløyfe():
+    # litt rein Python og litt NumPy, som stega som blir målte
+    a = np.random.default_rng(0).random(200_000)
+    s = 0
+    for i in range(200_000):
+        s += i
+    np.sort(a)
+    return s + float((a * a).sum())
+
+
+def kalibrer(repeat=7):
+    """Beste tid i sekund for kalibreringssløyfa, som mål på kor rask maskina er."""
+    tid = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        _sløyfe()
+        tid = min(tid, time.perf_counter() - t)
+    return tid
+
+
+class Grunnlinje:
+    """Grunnlinja i `sti` som {steg: {"sekund": ..., "kalibrering": ...}}."""
+
+    def __init__(self, sti, toleranse, min_delta=MIN_DELTA):
+        self.sti = sti
+        self.toleranse = toleranse
+        self.min_delta = min_delta
+        self.tider = json.loads(sti.read_text()) if sti.exists() else {}
+        self.nye = dict(self.tider)
+
+    def __bool__(self):
+        return bool(self.tider)
+
+    def samanlikn(self, nøkkel, tid):
+        """(venta tid på denne maskina no eller None, merke) for steget `nøkkel`.
+
+        Kall rett etter at steget er målt, så kalibreringa skjer under same last.
+        """
+        kalibrering = kalibrer()
+        self.nye[nøkkel] = {"sekund": tid, "kalibrering": kalibrering}
+        førre = self.tider.get(nøkkel)
+        if not isinstance(førre, dict):  # manglar, eller frå før kalibreringa
+            return None, ""
+        venta = førre["sekund"] * kalibrering / førre["kalibrering"]
+        if tid > venta * (1 + self.toleranse) and tid - venta > self.min_delta:
+            return venta, f"  TREGARE ({tid / venta:.2f}x)"
+        return venta, ""
+
+    def lagre(self):
+        """Skriv tidene frå denne køyringa som ny grunnlinje."""
+        self.sti.write_text(json.dumps(self.nye, indent=2, sort_keys=True) + "\n")
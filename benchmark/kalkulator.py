@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Tidsmåling og regresjonssjekk for lasting, berekning og tabellane i appen.
+
+Måler kvart steg for seg på den medfølgjande lista og på syntetiske lister
+der radene er kopierte 10 og 100 gonger (`--skala`). Beste tid av
+`--repeat` køyringar blir samanlikna med grunnlinja i grunnlinje.json,
+skalert til maskina (sjå grunnlinje.py), og steg som er meir enn
+`--toleranse` og minst 10 ms tregare blir flagga. Resultata for 2025
+(total skatt og skatt for nokre eigedomar) skal vere uendra.
+
+    python benchmark/kalkulator.py                      # mål og samanlikn
+    python benchmark/kalkulator.py --lagre              # skriv ny grunnlinje
+    python benchmark/kalkulator.py --skala 1 10 100 1000
+"""
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from analyse import takstfordelingar  # noqa: E402
+from grunnlinje import Grunnlinje  # noqa: E402
+from skattedata import LOKAL_CSV, konverter, les_artefakt, les_csv, skriv_artefakt, tolk_csv  # noqa: E402
+from skattemotor import (Eigedomar, Grunnlagsindeks, Politikk, berekn_kube,  # noqa: E402
+                         skatt_per_eigedom, total_skatt)
+from tabellar import (PERCENTIL_NAMN, farge_har_rad, farge_neg_pos, fargelegg,  # noqa: E402
+                      stillingar_rader, tiltak_rader, typiske_eigedomar)
+
+GRUNNLINJE = Path(__file__).resolve().parent / "grunnlinje.json"
+POLITIKK_2025 = Politikk(1.9, 4.0, 200000)
+POLITIKK = Politikk(1.8, 4.0, 200000)
+
+# Fasit for den medfølgjande lista for 2025
+TOTAL_SKATT_DAGENS = 36_791_159    # sum Skatt for eigedomar utan fritak
+TOTAL_SKATT_2025 = 36_927_775      # motoren med satsane for 2025, alle eigedomar
+SKATT_2025 = {                      # motoren, per eigedom
+    "1/2/0/0": 950,
+    "1/6/0/0": 4987,
+    "1/94/0/0": 6575,
+    "46/346/0/0": 6356,
+    "48/288/0/0": 0,
+}
+
+
+def syntetisk(df_tekst, skala):
+    """CSV-bytes med radene i `df_tekst` kopierte `skala` gonger, med unike Eiendom."""
+    if skala == 1:
+        return df_tekst.to_csv(index=False).encode()
+    kopiar = [df_tekst.assign(Eiendom=df_tekst["Eiendom"] + f"#{i}") for i in range(skala)]
+    return pd.concat(kopiar, ignore_index=True).to_csv(index=False).encode()
+
+
+def beste(funksjon, repeat, oppsett=lambda: ()):
+    """Beste tid i sekund av `repeat` kall; `oppsett` lagar argumenta og blir ikkje målt."""
+    tid = float("inf")
+    for _ in range(repeat):
+        args = oppsett()
+        t = time.perf_counter()
+        funksjon(*args)
+        tid = min(tid, time.perf_counter() - t)
+    return tid
+
+
+def vis(rader, farge, kolonne):
+    """Bygg tabellen slik appen gjer, og lag HTML-en Streamlit får."""
+    return fargelegg(pd.DataFrame(rader), farge, kolonne).to_html()
+
+
+def mål(raw, repeat):
+    """Tid per steg for éi liste, som {steg: sekund}."""
+    tekst = les_csv(raw)
+    df = konverter(tekst.copy())
+    e = Eigedomar.frå_df(df)
+    tider = {
+        "les_csv": beste(les_csv, repeat, lambda: (raw,)),
+        "konverter": beste(konverter, repeat, lambda: (tekst.copy(),)),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        sti = Path(tmp) / "liste.feather"
+        skriv_artefakt(raw, sti)
+        sha = hashlib.sha256(raw).hexdigest()
+        tider["les_artefakt"] = beste(les_artefakt, repeat, lambda: (sti, sha))
+    tider["eigedomar"] = beste(Eigedomar.frå_df, repeat, lambda: (df,))
+    tider["politikk"] = beste(skatt_per_eigedom, repeat, lambda: (e, POLITIKK))
+    tider["kube"] = beste(berekn_kube, repeat, lambda: (e,))
+    tider["grunnlagsindeks"] = beste(Grunnlagsindeks, repeat, lambda: (e,))
+
+    def typiske():
+        fordeling = takstfordelingar(e)["bolig"]
+        vis(typiske_eigedomar(fordeling, list(PERCENTIL_NAMN), POLITIKK.bolig_sats, POLITIKK.bunnfradrag),
+            farge_neg_pos, "Mogleg endring per mnd")
+
+    def tiltak():
+        midlar = 3_000_000
+        vis(tiltak_rader(midlar), farge_har_rad, "Har råd")
+        pd.DataFrame(stillingar_rader(midlar)).to_html()
+
+    tider["typiske"] = beste(typiske, repeat)
+    tider["tiltak"] = beste(tiltak, repeat)
+    return tider
+
+
+def sjekk_resultat(raw):
+    """Samanlikn med fasiten for 2025; return liste med avvik."""
+    df = tolk_csv(raw)
+    e = Eigedomar.frå_df(df)
+    avvik = []
+    dagens = int(df.loc[df["Fritak"] == "ingen", "Skatt"].sum())
+    if dagens != TOTAL_SKATT_DAGENS:
+        avvik.append(f"total skatt i lista {dagens} != {TOTAL_SKATT_DAGENS}")
+    total = total_skatt(e, POLITIKK_2025)
+    if total != TOTAL_SKATT_2025:
+        avvik.append(f"total skatt 2025 {total} != {TOTAL_SKATT_2025}")
+    skatt = skatt_per_eigedom(e, POLITIKK_2025)
+    rad = {eiendom: i for i, eiendom in enumerate(df["Eiendom"])}
+    for eiendom, venta in SKATT_2025.items():
+        fått = int(skatt[rad[eiendom]]) if eiendom in rad else None
+        if fått != venta:
+            avvik.append(f"skatt for {eiendom} {fått} != {venta}")
+    return avvik
+
+
+def sjekk_artefakt(raw, sti):
+    """Samanlikn tolk_csv med Feather-artefaktet, både `sti` og eit nyskrive; return liste med avvik."""
+    sha = hashlib.sha256(raw).hexdigest()
+    csv = tolk_csv(raw)
+    avvik = []
+    with tempfile.TemporaryDirectory() as tmp:
+        nytt = Path(tmp) / "liste.feather"
+        skriv_artefakt(raw, nytt)
+        for namn, df in (("nytt artefakt", les_artefakt(nytt, sha)), (str(sti), les_artefakt(sti, sha))):
+            if df is None:
+                avvik.append(f"{namn} manglar eller høyrer ikkje til CSV-en")
+                continue
+            try:
+                pd.testing.assert_frame_equal(df, csv)
+            except AssertionError as e:
+                avvik.append(f"{namn} er ulikt CSV-en: {str(e).splitlines()[0]}")
+    return avvik
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--csv", default=str(LOKAL_CSV))
+    ap.add_argument("--skala", type=int, nargs="+", default=[1, 10, 100],
+                    help="kor mange gonger radene blir kopierte")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--toleranse", type=float, default=0.25,
+                    help="del tregare enn grunnlinja før eit steg blir flagga")
+    ap.add_argument("--grunnlinje", default=str(GRUNNLINJE))
+    ap.add_argument("--lagre", action="store_true", help="skriv måla tider som ny grunnlinje")
+    args = ap.parse_args(argv)
+
+    raw = Path(args.csv).read_bytes()
+    feil = 0
+    for a in sjekk_resultat(raw) + sjekk_artefakt(raw, Path(args.csv).with_suffix(".feather")):
+        print("AVVIK:", a)
+        feil += 1
+    if not feil:
+        print(f"Resultat: total skatt {TOTAL_SKATT_2025:,} kr og {len(SKATT_2025)} eigedomar er uendra, "
+              "og Feather-artefaktet er likt CSV-en")
+
+    sti = Path(args.grunnlinje)
+    grunnlinje = Grunnlinje(sti, args.toleranse)
+    if not grunnlinje and not args.lagre:
+        print(f"ÅTVARING: ingen grunnlinje i {sti}; tidene blir ikkje samanlikna (køyr med --lagre)")
+    tekst = les_csv(raw)
+
+    print(f"{'skala':>6} {'steg':>16} {'tid':>10} {'grunnlinje':>11}")
+    for skala in args.skala:
+        for steg, tid in mål(syntetisk(tekst, skala), args.repeat).items():
+            venta, merke = grunnlinje.samanlikn(f"{skala}x/{steg}", tid)
+            feil += bool(merke)
+            venta_tekst = f"{venta * 1000:8.1f} ms" if venta is not None else f"{'–':>11}"
+            print(f"{skala:>5}x {steg:>16} {tid * 1000:7.1f} ms {venta_tekst}{merke}")
+
+    if args.lagre:
+        grunnlinje.lagre()
+        print(f"Grunnlinja er skriven til {sti}")
+    return 1 if feil else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Toppminne (RSS) for data/loaddata.py ved aukande tal på sider.
+
+Kvar køyring skjer i ein eigen prosess utan sidecache, så tala er
+samanliknbare. Med straumande tolking skal toppminnet vere om lag det
+same uansett kor mange sider som blir tolka.
+
+    python benchmark/minne.py                  # 25, 50, 100 sider og heile PDF-en
+    python benchmark/minne.py --pages 10 20    # valfrie sidetal
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+
+KØYR = """
+import resource, sys
+sys.path.insert(0, {data!r})
+import loaddata
+loaddata.main({args!r})
+print("MAXRSS", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def topp_rss(pdf, pages, workers):
+    """Køyr loaddata i ein ny prosess; return (toppminne i MB, sekund)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        # alle filene loaddata skriv går til tmp, ikkje til mappa skriptet blir køyrt frå
+        args = [str(pdf), "-o", f"{tmp}/ut.csv", "--issues", f"{tmp}/issues.txt",
+                "--cache", f"{tmp}/cache.sqlite", "--no-cache", "-w", str(workers),
+                "--kvalitet", f"{tmp}/kvalitet.csv", "--diff", f"{tmp}/endringar.csv"]
+        if pages:
+            args += ["--pages", str(pages)]
+        t = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", KØYR.format(data=str(DATA), args=args)],
+                             cwd=tmp, capture_output=True, text=True, check=True).stdout
+        sekund = time.perf_counter() - t
+    kb = int(next(L for L in out.splitlines() if L.startswith("MAXRSS")).split()[1])
+    return kb / 1024, sekund  # ru_maxrss er i kB på Linux
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--pdf", default=str(DATA / "skatteliste.pdf"))
+    ap.add_argument("--pages", type=int, nargs="+", default=[25, 50, 100, 0],
+                    help="sidetal å måle; 0 er heile PDF-en")
+    ap.add_argument("-w", "--workers", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    print(f"{'sider':>8} {'topp RSS':>10} {'tid':>8}")
+    for pages in args.pages:
+        mb, sekund = topp_rss(args.pdf, pages, args.workers)
+        print(f"{pages or 'alle':>8} {mb:>7.0f} MB {sekund:>6.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Tidsmåling av kald start: importtid og tid til første visning i app.py.
+
+Kvart steg blir køyrt i ein ny Python-prosess, så ingenting er importert
+eller bufra frå før. Median av `--repeat` køyringar blir samanlikna med
+grunnlinja i grunnlinje.json, skalert til maskina som i
+benchmark/kalkulator.py (sjå grunnlinje.py).
+
+* import_første:  modulane app.py importerer før første visning
+* import_alle:    alt app.py importerte før oppstartsbiletet (utan streamlit)
+* visning_bilete: første visning frå oppstartsbiletet, med import
+* visning_utan:   første visning frå CSV og Feather utan bilete, med import;
+                  lista blir lesen frå disk, så tida for nedlasting er ikkje med
+
+Streamlit er ikkje med i målingane, og heller ikkje matplotlib, som berre
+blir importert når figuren blir vist.
+
+    python benchmark/oppstart.py
+    python benchmark/oppstart.py --lagre
+"""
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from grunnlinje import Grunnlinje
+
+ROT = Path(__file__).resolve().parent.parent
+GRUNNLINJE = Path(__file__).resolve().parent / "grunnlinje.json"
+
+FØRSTE = "import datasett, framlegg, oppstart, profil, skattemotor"
+ALLE = (FØRSTE + "\nimport pandas, eksport, skattedata, tabellar, usikkerheit, validering")
+
+# Det app.py gjer før første st.metric for ny skatt
+VISNING = """
+første = {last}
+e = første.eigedomar
+_ = len(e), første.total_skatt_dagens
+_ = første.inntektskube.total(1.8, 4.0, 200000)
+"""
+
+STEG = {
+    "import_første": FØRSTE,
+    "import_alle": ALLE,
+    "visning_bilete": FØRSTE + "\nfrom datasett import DATASETT, STANDARD_DATASETT\n"
+                      + VISNING.format(last="oppstart.last_oppstart(DATASETT[STANDARD_DATASETT])"),
+    "visning_utan": ALLE + "\nfrom pathlib import Path\n"
+                    + VISNING.format(last="skattedata.last_skatteliste(Path({csv!r}).as_uri(), Path({csv!r}))"),
+}
+
+
+def køyr(kode):
+    """Sekund frå start av `kode` til slutt, i ein ny prosess med repoet på sys.path."""
+    program = ("import time\nt = time.perf_counter()\n" + kode
+               + "\nprint(time.perf_counter() - t)\n")
+    ut = subprocess.run([sys.executable, "-c", program], cwd=ROT, capture_output=True, text=True, check=True)
+    return float(ut.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--toleranse", type=float, default=0.25,
+                    help="del tregare enn grunnlinja før eit steg blir flagga")
+    ap.add_argument("--grunnlinje", default=str(GRUNNLINJE))
+    ap.add_argument("--lagre", action="store_true", help="skriv måla tider som ny grunnlinje")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, str(ROT))
+    from datasett import DATASETT, LOKAL_CSV, STANDARD_DATASETT
+    from oppstart import last_oppstart
+    if last_oppstart(DATASETT[STANDARD_DATASETT]) is None:
+        print("AVVIK: oppstartsbiletet manglar eller passar ikkje lista; køyr data/loaddata.py")
+        return 1
+
+    sti = Path(args.grunnlinje)
+    grunnlinje = Grunnlinje(sti, args.toleranse)
+    if not grunnlinje and not args.lagre:
+        print(f"ÅTVARING: ingen grunnlinje i {sti}; tidene blir ikkje samanlikna (køyr med --lagre)")
+    feil = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # kopi av lista og Feather-fila utan oppstartsbilete
+        csv = Path(tmp) / LOKAL_CSV.name
+        shutil.copy(LOKAL_CSV, csv)
+        shutil.copy(LOKAL_CSV.with_suffix(".feather"), csv.with_suffix(".feather"))
+
+        print(f"{'steg':>16} {'median':>10} {'grunnlinje':>11}")
+        for steg, kode in STEG.items():
+            tid = statistics.median(køyr(kode.replace("{csv!r}", repr(str(csv))))
+                                    for _ in range(args.repeat))
+            venta, merke = grunnlinje.samanlikn(f"oppstart/{steg}", tid)
+            feil += bool(merke)
+            venta_tekst = f"{venta * 1000:8.1f} ms" if venta is not None else f"{'–':>11}"
+            print(f"{steg:>16} {tid * 1000:7.1f} ms {venta_tekst}{merke}")
+
+    if args.lagre:
+        grunnlinje.lagre()
+        print(f"Grunnlinja er skriven til {sti}")
+    return 1 if feil else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
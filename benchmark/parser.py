@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Golden-sjekk og mikrobenchmark for linjetolkinga i data/loaddata.py.
+
+Tolkar alle linjer i PDF-en med loaddata.parse_line og samanliknar med
+den committa CSV-en og med referanseimplementasjonen under (tolkinga slik
+ho var før mønstra vart ferdig kompilerte). Rapporterer linjer per sekund
+for begge.
+
+    python benchmark/parser.py              # alle sider, golden + fart
+    python benchmark/parser.py --pages 20   # berre fart på dei 20 første sidene
+"""
+import argparse
+import csv
+import re
+import sys
+import time
+from pathlib import Path
+
+import pdfplumber
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+sys.path.insert(0, str(DATA))
+import loaddata as ld  # noqa: E402
+
+
+# --- Referanse: tolkinga før omskrivinga, uendra bortsett frå namn ---
+
+def ref_norm_digits(s):
+    if s is None: return ""
+    return re.sub(r"\D", "", s)
+
+def ref_norm_prom(s):
+    if not s: return ""
+    s = s.replace("‰", "").replace(",", ".")
+    return re.sub(r"[^\d.]", "", s)
+
+def ref_find_first_big_before(text, stoppos):
+    m = ld.BIG_NUM.search(text[:stoppos])
+    return m.group(0) if m else ""
+
+def ref_find_known_bunn(rest):
+    """Finn known bunn i resten; return (bunn_str, start_idx, end_idx) eller (None,-1,-1)."""
+    # match også med optional spaces: bygg variant regex
+    for b in ld.KNOWN_BUNNS:
+        pat = re.compile(r"\b" + r"\s*".join(list(b)) + r"\b")
+        m = pat.search(rest)
+        if m:
+            # return without spaces
+            return (re.sub(r"\s+", "", m.group(0)), m.start(), m.end())
+    # også prøv å finne bunn utan word-boundary (i tilfeller utan mellomrom)
+    for b in ld.KNOWN_BUNNS:
+        idx = rest.replace(" ", "").find(b)
+        if idx != -1:
+            # need to map idx in collapsed string back to index in original rest
+            # simplest: search for first occurrence of b in rest allowing optional spaces
+            pat = re.compile("(" + "".join([c + r"\s*" for c in b]) + ")")
+            m = pat.search(rest)
+            if m:
+                return (b, m.start(), m.end())
+    return (None, -1, -1)
+
+
+def ref_parse_line(line):
+    m = ld.MATRIKKEL.search(line)
+    if not m:
+        return None, None
+    eiendom = m.group(0)
+    adresse = line[:m.start()].strip().rstrip(",")
+    rest = line[m.end():].strip()
+
+    # finn skattenivå (NN%) i resten
+    pct = ld.PCT.search(rest)
+    if not pct:
+        # logg og hopp over
+        return [adresse, eiendom, "", "", "", "", "", "", ""], "no_pct"
+    skniv = ref_norm_digits(pct.group(0))
+
+    # takst: første big number innanfor starten av rest fram til pct.start()
+    takst_raw = ref_find_first_big_before(rest, pct.start())
+    takst = ref_norm_digits(takst_raw)
+
+    # no finn vi bunnfradrag ved hjelp av kjente verdiar
+    after_pct = rest[pct.end():].lstrip()
+    bunn_val, bstart, bend = ref_find_known_bunn(after_pct)
+
+    if bunn_val is not None:
+        # dersom bunn funne, sjå om bunn og grunn er klemt saman utan mellomrom
+        # substring frå bend og framover kan byrje utan mellomrom med grunn
+        # ta alt etter bend inntil promille som kandidatt for grunn
+        part_after_bunn = after_pct[bend:].lstrip()
+        # finn promille i dette substringet
+        prom_m = ld.PROM_RE.search(part_after_bunn)
+        if prom_m:
+            # grunn er alt frå start av part_after_bunn fram til promilles start
+            grund_candidate = part_after_bunn[:prom_m.start()].strip()
+            # remove spaces and non-digits
+            grunn = ref_norm_digits(grund_candidate)
+            prom = ref_norm_prom(prom_m.group(1))
+            # skatt er tal etter promille
+            post_prom = part_after_bunn[prom_m.end():].strip()
+            skatt_match = ld.BIG_NUM.search(post_prom)
+            skatt = ref_norm_digits(skatt_match.group(0)) if skatt_match else ""
+            # fritak er resten etter skatt
+            if skatt_match:
+                fritak = post_prom[skatt_match.end():].strip().strip(",")
+            else:
+                fritak = post_prom.strip().strip(",")
+            bunn = ref_norm_digits(bunn_val)
+            return [adresse, eiendom, takst, skniv, bunn, grunn, prom, skatt, fritak], None
+        else:
+            # om ingen promille funne, fallback - logg
+            return [adresse, eiendom, takst, skniv, bunn_val, "", "", "", ""], "no_prom_after_bunn"
+    else:
+        # ingen kjent bunnfunne — fallback: finn neste to store tal etter pct
+        # collapse spaces to help
+        after = after_pct
+        # finn to først store tal i after
+        numbers = re.findall(r"\d[\d\s]+\d|\d+", after)
+        if len(numbers) >= 3:
+            # forvent: bunn, grunn, prom/skatt...
+            bunn = ref_norm_digits(numbers[0])
+            grunn = ref_norm_digits(numbers[1])
+            # prom kan vere like etter grunn i original substring (sjekk PROM_RE)
+            prom_search = ld.PROM_RE.search(after)
+            prom = ref_norm_prom(prom_search.group(1)) if prom_search else ""
+            # skatt: ta første number som ligger etter prom (eller numbers[2])
+            skatt = ref_norm_digits(numbers[2])
+            # fritak: rest after the third number and/or prom
+            # crude attempt:
+            rest_after_third = after.split(numbers[2],1)[1] if numbers[2] in after else ""
+            fritak = rest_after_third.strip().strip(",")
+            return [adresse, eiendom, takst, skniv, bunn, grunn, prom, skatt, fritak], None
+        else:
+            return [adresse, eiendom, takst, skniv, "", "", "", "", ""], "no_bunn_candidates"
+
+
+# --- Sjekk og måling ---
+
+def read_lines(pdf_path, pages=None):
+    with pdfplumber.open(pdf_path) as pdf:
+        sider = pdf.pages if pages is None else pdf.pages[:pages]
+        return [L for side in sider for L in (side.extract_text() or "").split("\n")]
+
+
+def lines_per_second(parse, lines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for L in lines:
+            parse(L)
+        best = min(best, time.perf_counter() - t)
+    return len(lines) / best
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--pdf", default=str(DATA / ld.PDF))
+    ap.add_argument("--csv", default=str(DATA / ld.OUT))
+    ap.add_argument("--pages", type=int, help="berre dei N første sidene (ingen sjekk mot CSV)")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    lines = read_lines(args.pdf, args.pages)
+    feil = 0
+
+    # same resultat som referansen, linje for linje
+    for L in lines:
+        if ld.parse_line(L) != ref_parse_line(L):
+            print("AVVIK mot referanse:", L)
+            feil += 1
+
+    # same rader som den committa CSV-en
+    if args.pages is None:
+        rows = [row for L in lines for row in [ld.parse_line(L)[0]] if row is not None]
+        with open(args.csv, newline="", encoding="utf-8") as f:
+            golden = list(csv.reader(f))[1:]
+        if rows != golden:
+            n = next((i for i, (a, b) in enumerate(zip(rows, golden)) if a != b), min(len(rows), len(golden)))
+            print(f"AVVIK mot {args.csv} frå rad {n}: {len(rows)} rader mot {len(golden)}")
+            feil += 1
+        else:
+            print(f"Golden: {len(rows)} rader er like {args.csv}")
+
+    ref = lines_per_second(ref_parse_line, lines, args.repeat)
+    ny = lines_per_second(ld.parse_line, lines, args.repeat)
+    print(f"{len(lines)} linjer: referanse {ref:,.0f} linjer/s, no {ny:,.0f} linjer/s ({ny / ref:.2f}x)")
+    return 1 if feil else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
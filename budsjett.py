@@ -0,0 +1,101 @@
+"""Fordeling av meirinntekt på tiltak og stillingar.
+
+Tiltak blir valde éin gong eller ikkje, stillingar i heile årsverk. Planen
+med høgast samla prioritet blir funnen eksakt som eit sekkproblem
+(knapsack) med dynamisk programmering over budsjettet i einingar på
+EINING kr. Kostnader blir runda opp til heile einingar, så planen held seg
+alltid innanfor budsjettet. Ved lik prioritet vinn planen som brukar mest.
+"""
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from math import ceil
+from pathlib import Path
+
+import numpy as np
+
+KONFIG = Path(__file__).resolve().parent / "data" / "budsjett.json"
+EINING = 10_000      # kr per eining i budsjettet
+PLAN_BUFFER = 256    # løyste (budsjett, prioritetar) som blir haldne
+
+
+def last_konfig(sti=KONFIG):
+    """Les {"tiltak": {namn: kr}, "stillingar": {namn: kr per årsverk}} frå JSON-fila."""
+    with open(sti, encoding="utf-8") as f:
+        konfig = json.load(f)
+    tiltak = {str(k): float(v) for k, v in konfig.get("tiltak", {}).items()}
+    stillingar = {str(k): float(v) for k, v in konfig.get("stillingar", {}).items()}
+    if any(v < 0 for v in tiltak.values()) or any(v <= 0 for v in stillingar.values()):
+        raise ValueError(f"{sti}: kostnader må vere positive")
+    return tiltak, stillingar
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Vald plan: tiltaka, årsverk per stilling, og kor mykje som står att."""
+    tiltak: tuple
+    årsverk: dict
+    kostnad: float
+    rest: float
+
+
+@lru_cache(maxsize=PLAN_BUFFER)
+def _løys(kapasitet, poster):
+    """Optimal plan for `poster` = ((namn, einingar, prioritet, er_stilling), ...).
+
+    Return {namn: antal}. Stillingar blir delte i bitar på 1, 2, 4, ...
+    årsverk, så alt kan løysast som 0/1-sekk med éin tabell per bit.
+    """
+    bitar = []   # (namn, antal, einingar, verdi)
+    for namn, w, prioritet, stilling in poster:
+        maks = kapasitet // w if stilling else 1
+        k = 1
+        while maks > 0:
+            n = min(k, maks)
+            # prioritet først, deretter brukte einingar, som eitt heiltal
+            bitar.append((namn, n, n * w, n * (prioritet * (kapasitet + 1) + w)))
+            maks -= n
+            k *= 2
+
+    beste = np.zeros(kapasitet + 1, dtype=np.int64)
+    teke = np.zeros((len(bitar), kapasitet + 1), dtype=bool)
+    for i, (_, _, w, verdi) in enumerate(bitar):
+        if w > kapasitet:
+            continue
+        kandidat = beste[:kapasitet + 1 - w] + verdi
+        betre = kandidat > beste[w:]
+        teke[i, w:] = betre
+        beste[w:] = np.where(betre, kandidat, beste[w:])
+
+    antal = {}
+    c = kapasitet
+    for i in range(len(bitar) - 1, -1, -1):
+        if teke[i, c]:
+            namn, n, w, _ = bitar[i]
+            antal[namn] = antal.get(namn, 0) + n
+            c -= w
+    return antal
+
+
+def fordel(midlar, tiltak, stillingar, prioritet=None, eining=EINING):
+    """Plan for `midlar` kr over `tiltak` og `stillingar` ({namn: kr}).
+
+    `prioritet` er {namn: heiltal >= 0}; tiltak har 1 og stillingar 0 om
+    ikkje anna er gitt. Ein post med prioritet 0 blir ikkje vald. Tiltak
+    som kostar 0 kr er alltid med.
+    """
+    prioritet = prioritet or {}
+    kapasitet = max(int(midlar // eining), 0)
+    gratis = [n for n, kr in tiltak.items() if kr == 0]
+    poster = tuple(
+        (namn, ceil(kr / eining), int(prioritet.get(namn, 0 if stilling else 1)), stilling)
+        for stilling, postar in ((False, tiltak), (True, stillingar))
+        for namn, kr in postar.items()
+        if kr > 0 and prioritet.get(namn, 0 if stilling else 1) > 0
+    )
+    antal = _løys(kapasitet, poster) if poster else {}
+
+    valde = tuple(n for n in tiltak if n in antal or n in gratis)
+    årsverk = {n: antal[n] for n in stillingar if n in antal}
+    kostnad = sum(tiltak[n] for n in valde) + sum(stillingar[n] * a for n, a in årsverk.items())
+    return Plan(valde, årsverk, kostnad, midlar - kostnad)
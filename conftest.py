@@ -0,0 +1 @@
+# Med conftest.py i rota legg pytest rota til sys.path, så testane i tests/ kan importere modulane.
@@ -1,8 +1,24 @@
 #!/usr/bin/env python3
-import pdfplumber, re, csv
+import pdfplumber, re, csv, sys, os, argparse, hashlib, json, sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from pathlib import Path
+from pdfminer.pdftypes import resolve1
 
-PDF = "skatteliste.pdf"          # <-- endre ved behov
+ROOT = Path(__file__).resolve().parent.parent   # modulane til appen, sjå write_derived
+
+PDF = "skatteliste.pdf"          # standardverdiar, kan endrast med argument
 OUT = "skatteliste_clean_bunn.csv"
+ISSUES = "skatteliste_parse_issues.txt"
+CACHE = "skatteliste_sidecache.sqlite" # tolka rader per side, sjå page_key
+DIFF = "skatteliste_endringar.csv"     # endringar mot førre CSV
+KVALITET = "skatteliste_kvalitet.csv"  # rader som ikkje består kontrollane i validering.py
+CACHE_VERSION = 1                      # auk når tolkinga endrar seg, så sidene blir tolka på nytt
+SHARD_PAGES = 8                        # sider per oppgåve til kvar prosess
+
+COLS = ["Adresse","Eiendom","Takst","Skattenivå","Bunnfradrag","Grunnlag","Promillesats","Skatt","Fritak"]
 
 MATRIKKEL = re.compile(r"\d+/\d+/\d+/\d+")
 PCT = re.compile(r"\d+%")
@@ -11,148 +27,417 @@ BIG_NUM = re.compile(r"\d[\d\s]+\d|\d+")     # stort tall (med eller uten mellom
 
 # Liste over vanlege bunnfradrag (må være utan mellomrom her)
 KNOWN_BUNNS = ["0", "200000", "400000", "600000", "100000", "300000"]
+# ferdig kompilerte mønster per bunnfradrag, med valfrie mellomrom mellom sifra:
+# med ordgrense (første forsøk) og utan (fallback når tala er klemt saman)
+BUNN_WB = [re.compile(r"\b" + r"\s*".join(b) + r"\b") for b in KNOWN_BUNNS]
+BUNN_LOOSE = [re.compile("(" + "".join(c + r"\s*" for c in b) + ")") for b in KNOWN_BUNNS]
+NON_DIGIT = re.compile(r"\D")
+NON_PROM = re.compile(r"[^\d.]")
+SPACES = re.compile(r"\s+")
 
 def norm_digits(s):
     if s is None: return ""
-    return re.sub(r"\D", "", s)
+    return NON_DIGIT.sub("", s)
 
 def norm_prom(s):
     if not s: return ""
     s = s.replace("‰", "").replace(",", ".")
-    return re.sub(r"[^\d.]", "", s)
+    return NON_PROM.sub("", s)
 
 def find_first_big_before(text, stoppos):
     """Finn første big number i text[:stoppos] (frå venstre)."""
-    m = BIG_NUM.search(text[:stoppos])
+    m = BIG_NUM.search(text, 0, stoppos)
     return m.group(0) if m else ""
 
 def find_first_big_after(text, startpos):
-    m = BIG_NUM.search(text[startpos:])
-    return (m.group(0), startpos + m.start()) if m else ("", -1)
+    m = BIG_NUM.search(text, startpos)
+    return (m.group(0), m.start()) if m else ("", -1)
 
 def find_known_bunn(rest):
     """Finn known bunn i resten; return (bunn_str, start_idx, end_idx) eller (None,-1,-1)."""
-    # match også med optional spaces: bygg variant regex
-    for b in KNOWN_BUNNS:
-        pat = re.compile(r"\b" + r"\s*".join(list(b)) + r"\b")
+    # match også med optional spaces; første bunn i lista som passar vinn
+    for pat in BUNN_WB:
         m = pat.search(rest)
         if m:
             # return without spaces
-            return (re.sub(r"\s+", "", m.group(0)), m.start(), m.end())
+            return (SPACES.sub("", m.group(0)), m.start(), m.end())
     # også prøv å finne bunn utan word-boundary (i tilfeller utan mellomrom)
-    for b in KNOWN_BUNNS:
-        idx = rest.replace(" ", "").find(b)
-        if idx != -1:
-            # need to map idx in collapsed string back to index in original rest
-            # simplest: search for first occurrence of b in rest allowing optional spaces
-            pat = re.compile("(" + "".join([c + r"\s*" for c in b]) + ")")
+    collapsed = rest.replace(" ", "")
+    for b, pat in zip(KNOWN_BUNNS, BUNN_LOOSE):
+        if b in collapsed:
+            # finn same treff i rest, der det kan vere mellomrom mellom sifra
             m = pat.search(rest)
             if m:
                 return (b, m.start(), m.end())
     return (None, -1, -1)
 
-bad_lines = []
-rows = []
-cols = ["Adresse","Eiendom","Takst","Skattenivå","Bunnfradrag","Grunnlag","Promillesats","Skatt","Fritak"]
+def parse_line(line):
+    """Tolk éi linje; return (rad, feiltag) der rad er None utan matrikkelnummer."""
+    m = MATRIKKEL.search(line)
+    if not m:
+        return None, None
+    eiendom = m.group(0)
+    adresse = line[:m.start()].strip().rstrip(",")
+    rest = line[m.end():].strip()
 
-with pdfplumber.open(PDF) as pdf:
-    for page in pdf.pages:
-        text = page.extract_text()
-        if not text:
-            continue
-        for line in text.split("\n"):
-            m = MATRIKKEL.search(line)
-            if not m:
-                continue
-            eiendom = m.group(0)
-            adresse = line[:m.start()].strip().rstrip(",")
-            rest = line[m.end():].strip()
-
-            # finn skattenivå (NN%) i resten
-            pct = PCT.search(rest)
-            if not pct:
-                # logg og hopp over
-                bad_lines.append(("no_pct", line))
-                rows.append([adresse, eiendom, "", "", "", "", "", "", ""])
-                continue
-            skniv = norm_digits(pct.group(0))
-            skniv_end = pct.end()
-
-            # takst: første big number innanfor starten av rest fram til pct.start()
-            takst_raw = find_first_big_before(rest, pct.start())
-            takst = norm_digits(takst_raw)
-
-            # no finn vi bunnfradrag ved hjelp av kjente verdiar
-            after_pct = rest[pct.end():].lstrip()
-            bunn_val, bstart, bend = find_known_bunn(after_pct)
-
-            if bunn_val is not None:
-                # dersom bunn funne, sjå om bunn og grunn er klemt saman utan mellomrom
-                # substring frå bend og framover kan byrje utan mellomrom med grunn
-                # ta alt etter bend inntil promille som kandidatt for grunn
-                part_after_bunn = after_pct[bend:].lstrip()
-                # finn promille i dette substringet
-                prom_m = PROM_RE.search(part_after_bunn)
-                if prom_m:
-                    # grunn er alt frå start av part_after_bunn fram til promilles start
-                    grund_candidate = part_after_bunn[:prom_m.start()].strip()
-                    # remove spaces and non-digits
-                    grunn = norm_digits(grund_candidate)
-                    prom = norm_prom(prom_m.group(1))
-                    # skatt er tal etter promille
-                    post_prom = part_after_bunn[prom_m.end():].strip()
-                    skatt_match = BIG_NUM.search(post_prom)
-                    skatt = norm_digits(skatt_match.group(0)) if skatt_match else ""
-                    # fritak er resten etter skatt
-                    if skatt_match:
-                        fritak = post_prom[skatt_match.end():].strip().strip(",")
-                    else:
-                        fritak = post_prom.strip().strip(",")
-                    bunn = norm_digits(bunn_val)
-                    rows.append([adresse, eiendom, takst, skniv, bunn, grunn, prom, skatt, fritak])
-                    continue
-                else:
-                    # om ingen promille funne, fallback - logg
-                    bad_lines.append(("no_prom_after_bunn", line))
-                    rows.append([adresse, eiendom, takst, skniv, bunn_val, "", "", "", ""])
-                    continue
+    # finn skattenivå (NN%) i resten
+    pct = PCT.search(rest)
+    if not pct:
+        # logg og hopp over
+        return [adresse, eiendom, "", "", "", "", "", "", ""], "no_pct"
+    skniv = norm_digits(pct.group(0))
+
+    # takst: første big number innanfor starten av rest fram til pct.start()
+    takst_raw = find_first_big_before(rest, pct.start())
+    takst = norm_digits(takst_raw)
+
+    # no finn vi bunnfradrag ved hjelp av kjente verdiar
+    after_pct = rest[pct.end():].lstrip()
+    bunn_val, bstart, bend = find_known_bunn(after_pct)
+
+    if bunn_val is not None:
+        # dersom bunn funne, sjå om bunn og grunn er klemt saman utan mellomrom
+        # substring frå bend og framover kan byrje utan mellomrom med grunn
+        # ta alt etter bend inntil promille som kandidatt for grunn
+        part_after_bunn = after_pct[bend:].lstrip()
+        # finn promille i dette substringet
+        prom_m = PROM_RE.search(part_after_bunn)
+        if prom_m:
+            # grunn er alt frå start av part_after_bunn fram til promilles start
+            grund_candidate = part_after_bunn[:prom_m.start()].strip()
+            # remove spaces and non-digits
+            grunn = norm_digits(grund_candidate)
+            prom = norm_prom(prom_m.group(1))
+            # skatt er tal etter promille
+            post_prom = part_after_bunn[prom_m.end():].strip()
+            skatt_match = BIG_NUM.search(post_prom)
+            skatt = norm_digits(skatt_match.group(0)) if skatt_match else ""
+            # fritak er resten etter skatt
+            if skatt_match:
+                fritak = post_prom[skatt_match.end():].strip().strip(",")
             else:
-                # ingen kjent bunnfunne — fallback: finn neste to store tal etter pct
-                # collapse spaces to help
-                after = after_pct
-                # finn to først store tal i after
-                numbers = re.findall(r"\d[\d\s]+\d|\d+", after)
-                if len(numbers) >= 3:
-                    # forvent: bunn, grunn, prom/skatt...
-                    bunn = norm_digits(numbers[0])
-                    grunn = norm_digits(numbers[1])
-                    # prom kan vere like etter grunn i original substring (sjekk PROM_RE)
-                    prom_search = PROM_RE.search(after)
-                    prom = norm_prom(prom_search.group(1)) if prom_search else ""
-                    # skatt: ta første number som ligger etter prom (eller numbers[2])
-                    skatt = norm_digits(numbers[2])
-                    # fritak: rest after the third number and/or prom
-                    # crude attempt:
-                    rest_after_third = after.split(numbers[2],1)[1] if numbers[2] in after else ""
-                    fritak = rest_after_third.strip().strip(",")
-                    rows.append([adresse, eiendom, takst, skniv, bunn, grunn, prom, skatt, fritak])
-                    continue
-                else:
-                    bad_lines.append(("no_bunn_candidates", line))
-                    rows.append([adresse, eiendom, takst, skniv, "", "", "", "", ""])
-                    continue
-
-# skriv CSV og logg uparsa linjer til eiga fil
-with open(OUT, "w", newline="", encoding="utf-8") as f:
-    w = csv.writer(f)
-    w.writerow(cols)
-    w.writerows(rows)
-
-if bad_lines:
-    with open("skatteliste_parse_issues.txt", "w", encoding="utf-8") as g:
-        for tag, L in bad_lines:
-            g.write(f"{tag}\t{L}\n")
-
-print("Ferdig. Skrive:", OUT)
-if bad_lines:
-    print("Merk: nokre linjer kunne ikkje parseast automatisk. Sjå skatteliste_parse_issues.txt")
+                fritak = post_prom.strip().strip(",")
+            bunn = norm_digits(bunn_val)
+            return [adresse, eiendom, takst, skniv, bunn, grunn, prom, skatt, fritak], None
+        else:
+            # om ingen promille funne, fallback - logg
+            return [adresse, eiendom, takst, skniv, bunn_val, "", "", "", ""], "no_prom_after_bunn"
+    else:
+        # ingen kjent bunnfunne — fallback: finn neste to store tal etter pct
+        # collapse spaces to help
+        after = after_pct
+        # finn to først store tal i after
+        numbers = BIG_NUM.findall(after)
+        if len(numbers) >= 3:
+            # forvent: bunn, grunn, prom/skatt...
+            bunn = norm_digits(numbers[0])
+            grunn = norm_digits(numbers[1])
+            # prom kan vere like etter grunn i original substring (sjekk PROM_RE)
+            prom_search = PROM_RE.search(after)
+            prom = norm_prom(prom_search.group(1)) if prom_search else ""
+            # skatt: ta første number som ligger etter prom (eller numbers[2])
+            skatt = norm_digits(numbers[2])
+            # fritak: rest after the third number and/or prom
+            # crude attempt:
+            third = after.find(numbers[2])
+            rest_after_third = after[third + len(numbers[2]):] if third != -1 else ""
+            fritak = rest_after_third.strip().strip(",")
+            return [adresse, eiendom, takst, skniv, bunn, grunn, prom, skatt, fritak], None
+        else:
+            return [adresse, eiendom, takst, skniv, "", "", "", "", ""], "no_bunn_candidates"
+
+
+def parse_text(text):
+    """Tolk teksten frå éi side; return (rows, bad_lines)."""
+    rows, bad_lines = [], []
+    for line in text.split("\n"):
+        row, tag = parse_line(line)
+        if row is None:
+            continue
+        rows.append(row)
+        if tag:
+            bad_lines.append((tag, line))
+    return rows, bad_lines
+
+
+def page_key(page):
+    """Hash av rå innhaldsstraumar og ressursane som styrer teksten på sida.
+
+    Tekstuttrekket er nesten all køyretida, så vi hashar kjelda til teksten
+    i staden for sjølve teksten: uendra straumar gir uendra tekst. Med er
+    skrifttypane (BaseFont og ToUnicode-tabellen) og Form XObjects, som har
+    eigne straumar og ressursar; bilete påverkar ikkje teksten.
+    """
+    obj = page.page_obj
+    h = hashlib.sha256()
+    contents = resolve1(obj.attrs.get("Contents"))
+    for stream in contents if isinstance(contents, list) else [contents]:
+        stream = resolve1(stream)
+        if stream is not None:
+            h.update(stream.get_data())
+    hash_resources(h, obj.resources, set())
+    return h.hexdigest()
+
+
+def hash_resources(h, resources, seen):
+    """Legg skrifttypar og Form XObjects i `resources` til hashen `h`, rekursivt."""
+    fonts = resolve1(resources.get("Font")) or {}
+    for name in sorted(fonts):
+        font = resolve1(fonts[name]) or {}
+        h.update(f"{name}={font.get('BaseFont')}".encode())
+        tounicode = resolve1(font.get("ToUnicode"))
+        if hasattr(tounicode, "get_data"):
+            h.update(tounicode.get_data())
+    xobjects = resolve1(resources.get("XObject")) or {}
+    for name in sorted(xobjects):
+        ref = xobjects[name]
+        xobj = resolve1(ref)
+        if getattr(xobj.get("Subtype"), "name", None) != "Form" or getattr(ref, "objid", None) in seen:
+            continue
+        seen.add(getattr(ref, "objid", None))
+        h.update(f"{name}=".encode())
+        h.update(xobj.get_data())
+        hash_resources(h, resolve1(xobj.get("Resources")) or {}, seen)
+
+
+class PageCache:
+    """Tolka rader per side i ei SQLite-fil, med page_key som nøkkel.
+
+    Berre sidene som blir spurde etter ligg i minnet, så cachen veks ikkje
+    i RAM med storleiken på dokumentet.
+    """
+
+    def __init__(self, path, reset=False):
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (version INTEGER)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, data TEXT)")
+        row = self.db.execute("SELECT version FROM meta").fetchone()
+        if reset or row is None or row[0] != CACHE_VERSION:
+            self.db.execute("DELETE FROM pages")
+            self.db.execute("DELETE FROM meta")
+            self.db.execute("INSERT INTO meta VALUES (?)", (CACHE_VERSION,))
+        self.db.commit()
+
+    def __contains__(self, key):
+        return self.db.execute("SELECT 1 FROM pages WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, key):
+        rows, bad = json.loads(self.db.execute("SELECT data FROM pages WHERE key = ?", (key,)).fetchone()[0])
+        return rows, [tuple(b) for b in bad]
+
+    def put(self, key, rows, bad_lines):
+        self.db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?)",
+                        (key, json.dumps([rows, bad_lines], ensure_ascii=False)))
+
+    def keep_only(self, keys):
+        """Fjern sider som ikkje lenger finst i PDF-en."""
+        self.db.execute("CREATE TEMP TABLE keep (key TEXT PRIMARY KEY)")
+        self.db.executemany("INSERT OR IGNORE INTO keep VALUES (?)", ((k,) for k in keys))
+        self.db.execute("DELETE FROM pages WHERE key NOT IN (SELECT key FROM keep)")
+        self.db.execute("DROP TABLE keep")
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+def parse_pages(pdf_path, page_nos):
+    """Trekk ut og tolk sidene `page_nos`; gir (sidenr, rows, bad_lines) per side.
+
+    Kvar side blir lukka etter bruk, så pdfplumber ikkje held på layout og
+    teikn for sider vi er ferdige med.
+    """
+    with pdfplumber.open(pdf_path, pages=[i + 1 for i in page_nos]) as pdf:
+        for i, page in zip(sorted(page_nos), pdf.pages):
+            text = page.extract_text()
+            page.close()
+            yield (i,) + (parse_text(text) if text else ([], []))
+
+
+def parse_shard(pdf_path, page_nos):
+    """Som parse_pages, men som liste så det kan sendast tilbake frå ein prosess."""
+    return list(parse_pages(pdf_path, page_nos))
+
+
+def parse_stream(pdf_path, page_nos, workers=1):
+    """Gir (sidenr, rows, bad_lines) for `page_nos` i siderekkjefølgje.
+
+    Med fleire prosessar er berre 2 * workers bolkar i arbeid eller ferdige
+    om gongen, så resultat som ventar på ein treg bolk ikkje hopar seg opp.
+    """
+    if workers <= 1:
+        yield from parse_pages(pdf_path, page_nos)
+        return
+    shards = (page_nos[i:i + SHARD_PAGES] for i in range(0, len(page_nos), SHARD_PAGES))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = deque(ex.submit(parse_shard, pdf_path, s) for s in islice(shards, 2 * workers))
+        while pending:
+            result = pending.popleft().result()
+            shard = next(shards, None)
+            if shard is not None:
+                pending.append(ex.submit(parse_shard, pdf_path, shard))
+            yield from result
+
+
+def progress(done, total):
+    print(f"\rSider: {done}/{total}", end="" if done < total else "\n", file=sys.stderr, flush=True)
+
+
+def extract(pdf_path, workers=1, cache=None, max_pages=None):
+    """Gir (sidenr, rows, bad_lines) for kvar side i PDF-en, i rekkjefølgje.
+
+    Sider med same page_key som i `cache` (ein PageCache) blir henta
+    derifrå utan tekstuttrekk; dei andre blir tolka, eventuelt fordelt på
+    `workers` prosessar, og lagra i cachen. Utdata er det same uansett tal
+    på prosessar.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        keys = []
+        for page in pdf.pages[:max_pages]:
+            keys.append(page_key(page))
+            page.close()
+        whole = len(keys) == len(pdf.pages)
+
+    todo = [i for i, k in enumerate(keys) if cache is None or k not in cache]
+    print(f"{len(keys) - len(todo)} av {len(keys)} sider uendra sidan sist, tolkar {len(todo)}",
+          file=sys.stderr)
+
+    parsed = parse_stream(pdf_path, todo, workers)
+    todo = set(todo)
+    done = 0
+    for i, key in enumerate(keys):
+        if i in todo:
+            _, rows, bad_lines = next(parsed)
+            if cache is not None:
+                cache.put(key, rows, bad_lines)
+            done += 1
+            progress(done, len(todo))
+        else:
+            rows, bad_lines = cache.get(key)
+        yield i, rows, bad_lines
+
+    # med --pages kjenner vi ikkje nøklane til resten av sidene
+    if cache is not None and whole:
+        cache.keep_only(keys)
+
+
+def diff_csv(old_path, new_path, out_path):
+    """Skriv endra rader mellom to CSV-ar til out_path; return tal per endringstype.
+
+    Same matrikkelnummer kan stå fleire gonger (t.d. bolig og næring), så
+    nøkkelen er (Eiendom, n-te førekomst). Radene blir samanlikna i ein
+    mellombels SQLite-base på disk, så minnebruken ikkje veks med lista.
+    """
+    db = sqlite3.connect("")
+    for name, path in (("old", old_path), ("new", new_path)):
+        db.execute(f"CREATE TABLE {name}_raw (eiendom TEXT, nr INTEGER, row TEXT)")
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            db.executemany(f"INSERT INTO {name}_raw VALUES (?, ?, ?)",
+                           ((row[1], nr, json.dumps(row, ensure_ascii=False))
+                            for nr, row in enumerate(reader) if len(row) > 1))
+        db.execute(f"""CREATE TABLE {name} AS SELECT eiendom, row,
+                       ROW_NUMBER() OVER (PARTITION BY eiendom ORDER BY nr) AS n FROM {name}_raw""")
+        db.execute(f"CREATE INDEX {name}_key ON {name} (eiendom, n)")
+
+    queries = [
+        ("endra", "SELECT o.eiendom, o.row, n.row FROM old o JOIN new n USING (eiendom, n) "
+                  "WHERE o.row != n.row ORDER BY o.eiendom"),
+        ("fjerna", "SELECT o.eiendom, o.row, NULL FROM old o LEFT JOIN new n USING (eiendom, n) "
+                   "WHERE n.row IS NULL ORDER BY o.eiendom"),
+        ("lagt_til", "SELECT n.eiendom, NULL, n.row FROM new n LEFT JOIN old o USING (eiendom, n) "
+                     "WHERE o.row IS NULL ORDER BY n.eiendom"),
+    ]
+    counts = {}
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["Endring", "Eiendom", "Kolonnar", "Gammal", "Ny"])
+        for change, sql in queries:
+            counts[change] = 0
+            for eiendom, old, new in db.execute(sql):
+                old = json.loads(old) if old else []
+                new = json.loads(new) if new else []
+                cols = [c for c, a, b in zip(COLS, old, new) if a != b] if old and new else []
+                w.writerow([change, eiendom, " ".join(cols), ",".join(old), ",".join(new)])
+                counts[change] += 1
+    db.close()
+    return counts
+
+
+def write_derived(out, kvalitet):
+    """Skriv Feather-artefaktet og oppstartsbiletet for CSV-en `out`, og rapporten `kvalitet`.
+
+    Dette krev pandas, pyarrow og modulane til appen, så dei blir importerte
+    her og ikkje øvst: sjølve uttrekket frå PDF-en treng berre pdfplumber.
+    Return (artefakt, bilete, {skildring: tal rader} for kontrollane som slo ut).
+    """
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from oppstart import sti_for
+    from skattedata import skriv_artefakt, skriv_oppstart
+    from validering import KONTROLLAR, rapport, tal_per_kontroll
+
+    # typa, minnekartleggbar kopi (int64 takst, uint8 skattenivå, kategoriar)
+    artefakt = str(Path(out).with_suffix(".feather"))
+    with open(out, "rb") as f:
+        raw = f.read()
+    df = skriv_artefakt(raw, artefakt)
+    # tabellane og inntektskuben til første visning i app.py (sjå oppstart.py)
+    bilete = sti_for(out)
+    skriv_oppstart(raw, df, bilete)
+    feil = tal_per_kontroll(df["Feil"].to_numpy())
+    if feil:
+        rapport(df).to_csv(kvalitet, index=False)
+    return artefakt, bilete, {KONTROLLAR[namn]: n for namn, n in feil.items()}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Trekk ut skattelista frå PDF til CSV og Feather.")
+    ap.add_argument("pdf", nargs="?", default=PDF, help=f"PDF med skattelista (standard: {PDF})")
+    ap.add_argument("-o", "--out", default=OUT, help=f"CSV som skal skrivast (standard: {OUT})")
+    ap.add_argument("--issues", default=ISSUES, help=f"logg over uparsa linjer (standard: {ISSUES})")
+    ap.add_argument("-w", "--workers", type=int, default=1,
+                    help=f"tal på prosessar (standard: 1, maskina har {os.cpu_count()})")
+    ap.add_argument("--cache", default=CACHE, help=f"sidecache for uendra sider (standard: {CACHE})")
+    ap.add_argument("--no-cache", action="store_true", help="tolk alle sider på nytt")
+    ap.add_argument("--diff", default=DIFF, help=f"rapport over endra rader (standard: {DIFF})")
+    ap.add_argument("--kvalitet", default=KVALITET, help=f"rapport over rader med avvik (standard: {KVALITET})")
+    ap.add_argument("--pages", type=int, help="berre dei N første sidene (for testing)")
+    args = ap.parse_args(argv)
+
+    # rader og uparsa linjer blir skrivne etter kvart som sidene blir tolka;
+    # CSV-en går til ei mellombels fil så den gamle kan samanliknast etterpå
+    cache = PageCache(args.cache, reset=args.no_cache)
+    tmp = args.out + ".tmp"
+    issues = None
+    with open(tmp, "w", newline="", encoding="utf-8") as f, ExitStack() as stack:
+        w = csv.writer(f)
+        w.writerow(COLS)
+        for _, rows, bad_lines in extract(args.pdf, args.workers, cache, args.pages):
+            w.writerows(rows)
+            for tag, L in bad_lines:
+                if issues is None:  # fila blir berre laga om det finst uparsa linjer
+                    issues = stack.enter_context(open(args.issues, "w", encoding="utf-8"))
+                issues.write(f"{tag}\t{L}\n")
+    cache.close()
+
+    changes = diff_csv(args.out, tmp, args.diff) if os.path.exists(args.out) else None
+    os.replace(tmp, args.out)
+
+    artefakt, bilete, feil = write_derived(args.out, args.kvalitet)
+
+    print("Ferdig. Skrive:", args.out, artefakt, "og", bilete)
+    if changes is not None:
+        print(f"Endringar mot førre {args.out}: {changes['lagt_til']} nye, {changes['fjerna']} fjerna, "
+              f"{changes['endra']} endra rader. Sjå {args.diff}")
+    if issues is not None:
+        print(f"Merk: nokre linjer kunne ikkje parseast automatisk. Sjå {args.issues}")
+    if feil:
+        print(f"Avvik i data (sjå {args.kvalitet}):")
+        for skildring, n in feil.items():
+            print(f"  {n:>5}  {skildring}")
+
+
+if __name__ == "__main__":
+    main()
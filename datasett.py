@@ -0,0 +1,41 @@
+"""Skattelistene appen kan vise, utan å importere pandas.
+
+app.py treng lista over datasett før første visning, og oppstart.py les
+oppstartsbiletet ut frå `lokal`; difor ligg definisjonane her og ikkje i
+skattedata.py, som re-eksporterer dei.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+
+from skattemotor import KLASSESATSAR, STD_BUNNFRADRAG, sjekk_klassesatsar
+
+URL = "https://raw.githubusercontent.com/jensmorten/malvikeskattkalkulator/refs/heads/main/data/skatteliste_clean_bunn.csv"
+LOKAL_CSV = Path(__file__).resolve().parent / "data" / "skatteliste_clean_bunn.csv"
+
+
+@dataclass(frozen=True)
+class Datasett:
+    """Ei skatteliste appen kan vise: kommune, skatteår og kvar ho ligg.
+
+    `klassar` er ((klasse, sats i lista), ...) for eigedomsklassane i
+    kommunen, sjå skattemotor.KLASSESATSAR; to klassar kan ikkje ha same sats.
+    """
+    id: str
+    kommune: str
+    år: int
+    url: str
+    lokal: Path
+    nettside: str
+    klassar: tuple = tuple(KLASSESATSAR.items())
+    std_bunnfradrag: int = STD_BUNNFRADRAG
+
+    def __post_init__(self):
+        sjekk_klassesatsar(dict(self.klassar))
+
+
+# Nye kommunar og år blir lagde til her; ingenting blir lasta før det blir valt
+DATASETT = {d.id: d for d in [
+    Datasett("malvik-2025", "Malvik", 2025, URL, LOKAL_CSV,
+             "https://www.malvik.kommune.no/nyhet/offentlig-ettersyn-eiendomsskatt-2025"),
+]}
+STANDARD_DATASETT = "malvik-2025"
@@ -0,0 +1,82 @@
+"""Søk på adresse og matrikkelnummer (gnr/bnr/fnr/snr) i skattelista.
+
+Indeksen blir bygd éin gong per lasta liste. Eit søk er eit binærsøk i
+sorterte nøklar for prefiks, og eit oppslag i ein trigram-indeks for
+skrivefeil, så lista blir aldri gjennomgått rad for rad.
+"""
+import bisect
+import re
+
+import numpy as np
+
+MATRIKKEL_SØK = re.compile(r"^\d+([/\s.-]+\d*)*$")   # t.d. "1/6", "1 6 0" eller "12-"
+MIN_LIKSKAP = 0.3                                     # Jaccard-likskap på trigram for fuzzy treff
+
+
+def _normaliser(tekst):
+    return " ".join(str(tekst).lower().replace(",", " ").split())
+
+
+def _trigram(tekst):
+    t = f"  {tekst} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+class Eigedomssok:
+    """Prefiks- og fuzzy-søk over Adresse og Eiendom i ein skatteliste-DataFrame."""
+
+    def __init__(self, df):
+        adresser = [_normaliser(a) if isinstance(a, str) else "" for a in df["Adresse"]]
+        eiendomar = [str(e) for e in df["Eiendom"]]
+
+        # sorterte (nøkkel, rad) for prefikssøk
+        self._adresser = sorted((a, i) for i, a in enumerate(adresser) if a)
+        self._adresse_nøklar = [a for a, _ in self._adresser]
+        self._eiendomar = sorted((e, i) for i, e in enumerate(eiendomar))
+        self._eiendom_nøklar = [e for e, _ in self._eiendomar]
+
+        # trigram -> radnummer, for adresser med skrivefeil
+        postar = {}
+        for i, a in enumerate(adresser):
+            for t in _trigram(a) if a else ():
+                postar.setdefault(t, []).append(i)
+        self._postar = {t: np.array(r, dtype=np.int32) for t, r in postar.items()}
+        self._tal_trigram = np.array([len(_trigram(a)) if a else 0 for a in adresser])
+
+    @staticmethod
+    def _prefiks(nøklar, par, prefiks, n):
+        start = bisect.bisect_left(nøklar, prefiks)
+        treff = []
+        for nøkkel, rad in par[start:start + n]:
+            if not nøkkel.startswith(prefiks):
+                break
+            treff.append(rad)
+        return treff
+
+    def sok(self, tekst, n=10):
+        """Return radnummer (posisjon i lista) for inntil `n` treff, beste først."""
+        q = _normaliser(tekst)
+        if not q:
+            return []
+
+        if MATRIKKEL_SØK.match(q):
+            prefiks = "/".join(re.split(r"[/\s.-]+", q))
+            return self._prefiks(self._eiendom_nøklar, self._eiendomar, prefiks, n)
+
+        treff = self._prefiks(self._adresse_nøklar, self._adresser, q, n)
+        if len(treff) < n:
+            for rad in self._fuzzy(q, n):
+                if rad not in treff:
+                    treff.append(rad)
+        return treff[:n]
+
+    def _fuzzy(self, q, n):
+        qt = _trigram(q)
+        postar = [self._postar[t] for t in qt if t in self._postar]
+        if not postar:
+            return []
+        felles = np.bincount(np.concatenate(postar), minlength=len(self._tal_trigram))
+        likskap = felles / (len(qt) + self._tal_trigram - felles).clip(min=1)
+        beste = np.argpartition(-likskap, min(n, len(likskap) - 1))[:n]
+        beste = beste[np.argsort(-likskap[beste], kind="stable")]
+        return [int(i) for i in beste if likskap[i] >= MIN_LIKSKAP]
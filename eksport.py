@@ -0,0 +1,184 @@
+"""Eksport av ny skatt per eigedom for éin politikk, til CSV, Parquet eller Excel.
+
+Fila blir skriven i blokker på BLOKK rader direkte til disk, aldri som
+heil tabell i minnet, og ligg att i EKSPORT_MAPPE under ein nøkkel av
+lista (sha256) og politikken. Same datasett og politikk gir difor same fil,
+og nye nedlastingar les berre fila. Dei minst nyleg brukte filene blir
+sletta når det er meir enn EKSPORT_BUFFER, men aldri ei fil som er brukt
+dei siste MIN_ALDER sekunda, så ei økt rekk å opne fila ho fekk.
+
+Excel krev openpyxl, som ikkje er med i requirements.txt; utan det er
+berre CSV og Parquet tilgjengelege. Eit ark i Excel har plass til
+XLSX_RADER rader, så lengre lister blir delte på fleire ark.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from skattemotor import KLASSENAMN, satsar_per_rad, skatt_per_eigedom
+
+try:
+    import openpyxl
+except ImportError:  # Excel er valfritt
+    openpyxl = None
+
+BLOKK = 50_000       # rader per blokk i fila
+BITAR = 2**16        # byte per bit når fila blir send vidare
+EKSPORT_BUFFER = 32  # ferdige filer som blir haldne på disk
+MIN_ALDER = 300      # sekund ei fil blir halden etter at ho sist vart brukt
+EKSPORT_MAPPE = Path(tempfile.gettempdir()) / "skattekalkulator-eksport"
+XLSX_RADER = 1_048_576  # rader per ark i Excel, med overskrifta
+
+FORMAT = {  # format: (filending, MIME-type)
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def format_tilgjengelege():
+    """Formata som kan skrivast her; xlsx berre med openpyxl."""
+    return [f for f in FORMAT if f != "xlsx" or openpyxl is not None]
+
+
+def blokker(skatteliste, politikk, blokk=BLOKK):
+    """DataFrame-ar på inntil `blokk` rader med dagens og ny skatt per eigedom."""
+    e = skatteliste.eigedomar
+    df = skatteliste.df
+    # motoren reknar heile lista som tabellar; berre tabellen i fila blir delt opp
+    skatt_ny = skatt_per_eigedom(e, politikk)
+    promille, bunn, _ = satsar_per_rad(e, politikk)
+    klasse = skatteliste.klasse.rename_categories(lambda k: KLASSENAMN.get(k, k))
+    for start in range(0, len(df), blokk):
+        s = slice(start, start + blokk)
+        yield pd.DataFrame({
+            "Eiendom": df["Eiendom"].iloc[s].astype(str).to_numpy(),
+            "Adresse": df["Adresse"].iloc[s].fillna("").astype(str).to_numpy(),
+            "Klasse": klasse[s],
+            "Fritak": df["Fritak"].iloc[s].astype(str).to_numpy(),
+            "Takst": e.takst[s].astype(np.int64),
+            "Skattenivå": e.skatteniva[s],
+            "Bunnfradrag": e.bunnfradrag[s].astype(np.int64),
+            "Promillesats": e.promillesats[s],
+            "Skatt": skatteliste.skatt_dagens[s].astype(np.int64),
+            "Bunnfradrag_ny": bunn[s].astype(np.int64),
+            "Promillesats_ny": promille[s],
+            "Skatt_ny": skatt_ny[s],
+            "Endring": skatt_ny[s] - skatteliste.skatt_dagens[s].astype(np.int64),
+        })
+
+
+def samandrag(skatteliste, politikk):
+    """(namn, verdi)-rader om politikken og totalane, for samandraget i Excel."""
+    res = skatteliste.resultat(politikk)
+    return [
+        ("Promillesats bolig", politikk.bolig_sats),
+        ("Promillesats næring", politikk.naering_sats),
+        ("Botnfrådrag", politikk.bunnfradrag),
+        *((f"Promillesats {KLASSENAMN.get(k, k)}", s) for k, s in politikk.satsar),
+        ("Total skatt i dag", skatteliste.total_skatt_dagens),
+        ("Total ny skatt", res.total),
+        ("Endring", res.endring),
+        ("Eigedomar som betaler meir", res.meir),
+        ("Eigedomar som betaler mindre", res.mindre),
+    ]
+
+
+def _skriv_csv(skatteliste, politikk, f):
+    tekst = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    for i, d in enumerate(blokker(skatteliste, politikk)):
+        d.to_csv(tekst, index=False, header=i == 0, lineterminator="\n")
+    tekst.detach()  # flushar og lèt `f` vere open
+
+
+def _skriv_parquet(skatteliste, politikk, f):
+    skrivar = None
+    for d in blokker(skatteliste, politikk):
+        t = pa.Table.from_pandas(d, preserve_index=False)
+        if skrivar is None:
+            skrivar = pq.ParquetWriter(f, t.schema)
+        skrivar.write_table(t)  # éi radgruppe per blokk
+    if skrivar is not None:
+        skrivar.close()
+
+
+def _skriv_xlsx(skatteliste, politikk, f):
+    # write_only skriv radene til disk etter kvart i staden for å halde heile arket
+    bok = openpyxl.Workbook(write_only=True)
+    ark = bok.create_sheet("Samandrag")
+    for rad in samandrag(skatteliste, politikk):
+        ark.append(rad)
+    ark, rader, nr = None, XLSX_RADER, 0
+    for d in blokker(skatteliste, politikk):
+        for rad in d.astype(object).itertuples(index=False):
+            if rader == XLSX_RADER:  # arket er fullt: nytt ark med overskrift
+                nr += 1
+                ark = bok.create_sheet("Per eigedom" if nr == 1 else f"Per eigedom {nr}")
+                ark.append(list(d.columns))
+                rader = 1
+            ark.append(list(rad))
+            rader += 1
+    bok.save(f)
+
+
+SKRIVARAR = {"csv": _skriv_csv, "parquet": _skriv_parquet, "xlsx": _skriv_xlsx}
+
+
+def lag_fil(skatteliste, politikk, format="csv"):
+    """Sti til eksportfila for `politikk`, skriven første gong ho blir bedd om."""
+    if format not in format_tilgjengelege():
+        raise ValueError(f"ukjend eller utilgjengeleg format {format!r}")
+    nøkkel = hashlib.sha256(f"{skatteliste.sha256}|{politikk!r}".encode()).hexdigest()[:32]
+    sti = EKSPORT_MAPPE / f"{nøkkel}{FORMAT[format][0]}"
+    try:
+        os.utime(sti)  # nyleg brukt
+        return sti
+    except FileNotFoundError:
+        pass
+
+    EKSPORT_MAPPE.mkdir(parents=True, exist_ok=True)
+    # skriv til ei mellombels fil og flytt ho på plass, så samtidige økter ikkje ser halve filer
+    fd, tmp = tempfile.mkstemp(dir=EKSPORT_MAPPE, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            SKRIVARAR[format](skatteliste, politikk, f)
+        os.replace(tmp, sti)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    _rydd()
+    return sti
+
+
+def _rydd():
+    """Slett dei minst nyleg brukte filene til det er EKSPORT_BUFFER att.
+
+    Filer brukte dei siste MIN_ALDER sekunda blir ståande, sjølv om det gjer
+    at det ligg fleire enn EKSPORT_BUFFER filer ei stund.
+    """
+    endingar = {s for s, _ in FORMAT.values()}
+    grense = time.time() - MIN_ALDER
+    filer = []
+    for p in EKSPORT_MAPPE.iterdir():
+        try:
+            if p.suffix in endingar:
+                filer.append((p.stat().st_mtime, p))
+        except FileNotFoundError:  # sletta av ei anna økt
+            pass
+    for brukt, p in sorted(filer)[:-EKSPORT_BUFFER]:
+        if brukt < grense:
+            p.unlink(missing_ok=True)
+
+
+def bitar(f, storleik=BITAR):
+    """Innhaldet i den opne fila `f` som bytes-bitar, for å sende fila utan å lese ho heilt."""
+    while bit := f.read(storleik):
+        yield bit
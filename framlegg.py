@@ -0,0 +1,116 @@
+"""Namngitte framlegg til satsar, som kan delast i adressa og samanliknast.
+
+Eit framlegg blir skrive som `namn:bolig,næring,botnfrådrag` i
+query-parameteren `framlegg`, med `klasse=sats` for andre eigedomsklassar
+til slutt, t.d.
+
+    ?framlegg=Raudt:2.9,5,1200000&framlegg=Mitt:2.1,4,400000,verk_og_bruk=7
+
+Verdiar over grensene til sliderane i app.py blir sette ned til grensa,
+og bolig og næring kan ikkje givast som `klasse=sats`.
+
+Resultatet for kvart framlegg blir bufra per skatteliste (sjå
+Skatteliste.resultat), så ei lenkje mange opnar blir rekna ut éin gong.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from analyse import AVRUNDING
+from skattemotor import BOLIG_SATSAR, BUNNFRADRAG, NAERING_SATSAR, Politikk, skatt_per_eigedom
+
+PARAMETER = "framlegg"   # query-parameter i adressa
+MAKS_FRAMLEGG = 8        # framlegg som blir lesne frå éi adresse
+
+# Øvre grenser som på sliderane; 7 ‰ gjeld også andre klassar, som i eigedomsskattelova
+MAKS_BOLIG = float(BOLIG_SATSAR[-1])
+MAKS_SATS = float(NAERING_SATSAR[-1])
+MAKS_BUNNFRADRAG = float(BUNNFRADRAG[-1])
+RESERVERTE = ("bolig", "naering")   # har eigne felt og kan ikkje vere `klasse=sats`
+
+KOMMUNEDIREKTOREN = Politikk(1.8, 4.0, 200_000)
+RAUDT = Politikk(2.9, 5.0, 1_200_000)
+FASTE = {"Kommunedirektøren": KOMMUNEDIREKTOREN, "Raudt": RAUDT}
+
+
+def til_tekst(namn, politikk):
+    """`namn:bolig,næring,botnfrådrag[,klasse=sats...]` for adressa."""
+    tal = [f"{politikk.bolig_sats:g}", f"{politikk.naering_sats:g}", f"{politikk.bunnfradrag:.0f}"]
+    tal += [f"{k}={s:g}" for k, s in politikk.satsar]
+    return f"{namn}:{','.join(tal)}"
+
+
+def frå_tekst(tekst):
+    """(namn, Politikk) frå til_tekst-forma; ValueError om teksten ikkje kan lesast.
+
+    Verdiar over MAKS_* blir sette ned til grensa.
+    """
+    namn, kolon, rest = tekst.rpartition(":")
+    namn = namn.strip()
+    if not kolon or not namn:
+        raise ValueError(f"framlegget {tekst!r} manglar namn")
+    delar = rest.split(",")
+    if len(delar) < 3:
+        raise ValueError(f"framlegget {namn!r} treng bolig, næring og botnfrådrag")
+    try:
+        bolig, naering, bunn = (float(d) for d in delar[:3])
+        satsar = tuple(sorted((k.strip(), float(s)) for k, _, s in (d.partition("=") for d in delar[3:])))
+    except ValueError:
+        raise ValueError(f"framlegget {namn!r} har verdiar som ikkje er tal") from None
+    if not all(np.isfinite(v) and v >= 0 for v in (bolig, naering, bunn, *(s for _, s in satsar))):
+        raise ValueError(f"framlegget {namn!r} har negative eller ugyldige verdiar")
+    reserverte = sorted({k for k, _ in satsar} & set(RESERVERTE))
+    if reserverte:
+        raise ValueError(f"framlegget {namn!r} set {', '.join(reserverte)} som klasse; bruk dei tre første tala")
+    satsar = tuple((k, min(s, MAKS_SATS)) for k, s in satsar)
+    return namn, Politikk(min(bolig, MAKS_BOLIG), min(naering, MAKS_SATS), min(bunn, MAKS_BUNNFRADRAG),
+                          satsar=satsar)
+
+
+def les_adresse(verdiar):
+    """({namn: Politikk}, [feilmeldingar]) frå alle `framlegg`-verdiane i adressa."""
+    framlegg, feil = {}, []
+    for tekst in list(verdiar)[:MAKS_FRAMLEGG]:
+        try:
+            namn, politikk = frå_tekst(tekst)
+        except ValueError as e:
+            feil.append(str(e))
+        else:
+            framlegg[namn] = politikk
+    return framlegg, feil
+
+
+@dataclass(frozen=True)
+class Resultat:
+    """Samandrag av eitt framlegg for samanlikningsvisinga. Kr per år.
+
+    `total` og `endring` er rekna som i appen og api.py: ny skatt for alle
+    rader mot skatten i lista for eigedomar utan fritak. Teljingane gjeld
+    eigedomar utan fritak.
+    """
+    total: int
+    endring: int
+    meir: int               # eigedomar som betaler meir enn i dag
+    mindre: int
+    median_endring: float   # for eigedomar som betaler skatt i dag eller etter framlegget
+    per_klasse: dict        # {klasse: total}; "annan" for rader utan klasse
+
+
+def resultat(eigedomar, skatt_dagens, politikk):
+    """Resultat for `politikk`; sjå Skatteliste.resultat for den bufra utgåva."""
+    e = eigedomar
+    maske = e.utan_fritak
+    ny = skatt_per_eigedom(e, politikk)
+    endring = ny[maske] - skatt_dagens[maske]
+    betalar = (ny[maske] > 0) | (skatt_dagens[maske] > 0)
+    klasse = np.where(e.klasse < 0, len(e.klassar), e.klasse)
+    per_klasse = np.bincount(klasse, weights=ny, minlength=len(e.klassar) + 1)
+    total = int(ny.sum())
+    return Resultat(
+        total=total,
+        endring=total - int(skatt_dagens[maske].sum()),
+        meir=int((endring > AVRUNDING).sum()),
+        mindre=int((endring < -AVRUNDING).sum()),
+        median_endring=float(np.median(endring[betalar])) if betalar.any() else 0.0,
+        per_klasse={k: int(v) for k, v in zip([*e.klassar, "annan"], per_klasse) if v or k != "annan"},
+    )
@@ -0,0 +1,149 @@
+"""Oppstartsbilete: tabellane til første visning, førehandsrekna til disk.
+
+Ein kald start av app.py må elles importere pandas, hente CSV-en, tolke ho
+og rekne rutenettet før noko kan visast. data/loaddata.py skriv difor
+tabellane til skattemotoren (Eigedomar), dagens skatt og inntektskuben til
+ei ukomprimert .npz-fil ved sida av CSV-en. Fila blir lesen med berre
+NumPy, så første visning i app.py treng verken pandas eller nett, og
+skattedata.py brukar same tabellar når heile lista blir lasta.
+
+Biletet høyrer til éin CSV (sha256) og eitt oppsett av eigedomsklassar;
+passar det ikkje, blir det ikkje brukt. Auk VERSJON når innhaldet endrar seg.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, fields
+from functools import cached_property, lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from skattemotor import Eigedomar, Grunnlagsindeks, Inntektskube
+
+VERSJON = 1
+EIGEDOMSTABELLAR = ("takst", "skatteniva", "bunnfradrag", "promillesats", "klasse",
+                    "nytt_bunnfradrag", "utan_fritak")
+
+_lås = threading.Lock()
+_sha = {}          # lokal sti: ((mtime_ns, storleik), sha256), så CSV-en ikkje blir lesen kvar gong
+_gjeldande = {}    # url: sha256 for lista skattedata.py har no
+
+
+@dataclass(frozen=True, eq=False)
+class Oppstart:
+    """Det første visinga treng, med same namn som på skattedata.Skatteliste."""
+    sha256: str
+    eigedomar: Eigedomar
+    inntektskube: Inntektskube
+    skatt_dagens: np.ndarray
+
+    @cached_property
+    def total_skatt_dagens(self):
+        """Sum skatt i lista for eigedomar utan fritak."""
+        return int(self.skatt_dagens[self.eigedomar.utan_fritak].sum())
+
+    @cached_property
+    def grunnlagsindeks(self):
+        """Sorterte grunnlag for oppslag på vilkårlege satsar og frådrag."""
+        return Grunnlagsindeks(self.eigedomar)
+
+
+def sti_for(lokal):
+    """Oppstartsbiletet til CSV-en `lokal`: skatteliste.csv -> skatteliste.oppstart.npz."""
+    return Path(lokal).with_suffix(".oppstart.npz")
+
+
+def skriv_bilete(sti, sha256, eigedomar, inntektskube, skatt_dagens):
+    """Skriv biletet for CSV-en med `sha256` til `sti`, via ei mellombels fil."""
+    e = eigedomar
+    tabellar = {
+        "versjon": np.array(VERSJON),
+        "sha256": np.array(sha256),
+        "klassar": np.array(e.klassar, dtype=str),
+        "klassesatsar": e.klassesatsar,
+        "std_bunnfradrag": np.array(e.std_bunnfradrag),
+        "skatt_dagens": skatt_dagens,
+        **{namn: getattr(e, namn) for namn in EIGEDOMSTABELLAR},
+        **{f"kube_{f.name}": getattr(inntektskube, f.name) for f in fields(Inntektskube)},
+    }
+    fd, tmp = tempfile.mkstemp(dir=Path(sti).parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **tabellar)
+        os.chmod(tmp, 0o644)  # mkstemp lagar fila berre lesbar for eigaren
+        os.replace(tmp, sti)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def les_bilete(sti, sha256, klassar, std_bunnfradrag):
+    """Oppstart frå `sti` om biletet høyrer til `sha256` og oppsettet, elles None.
+
+    Bufra på sti og endringstid, så app.py og skattedata.py deler same tabellar.
+    """
+    try:
+        endra = os.stat(sti).st_mtime_ns
+    except OSError:
+        return None
+    return _les(str(sti), endra, sha256, klassar, std_bunnfradrag)
+
+
+@lru_cache(maxsize=8)
+def _les(sti, endra, sha256, klassar, std_bunnfradrag):
+    # eit gammalt eller øydelagt bilete gir None, så appen les CSV-en i staden
+    try:
+        with np.load(sti, allow_pickle=False) as f:
+            t = {namn: f[namn] for namn in f.files}
+        if (int(t.get("versjon", -1)) != VERSJON or str(t["sha256"]) != sha256
+                or tuple(t["klassar"].tolist()) != tuple(k for k, _ in klassar)
+                or not np.array_equal(t["klassesatsar"], [s for _, s in klassar])
+                or float(t["std_bunnfradrag"]) != float(std_bunnfradrag)):
+            return None
+        for a in t.values():
+            a.setflags(write=False)
+        eigedomar = Eigedomar(
+            **{namn: t[namn] for namn in EIGEDOMSTABELLAR},
+            klassar=tuple(t["klassar"].tolist()),
+            klassesatsar=t["klassesatsar"],
+            std_bunnfradrag=float(t["std_bunnfradrag"]),
+        )
+        kube = Inntektskube(**{f.name: t[f"kube_{f.name}"] for f in fields(Inntektskube)})
+        return Oppstart(sha256, eigedomar, kube, t["skatt_dagens"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _sha256(lokal):
+    stat = lokal.stat()
+    nøkkel = (stat.st_mtime_ns, stat.st_size)
+    with _lås:
+        treff = _sha.get(lokal)
+    if treff is None or treff[0] != nøkkel:
+        treff = (nøkkel, hashlib.sha256(lokal.read_bytes()).hexdigest())
+        with _lås:
+            _sha[lokal] = treff
+    return treff[1]
+
+
+def last_oppstart(datasett):
+    """Oppstartsbiletet for `datasett` (datasett.Datasett), eller None.
+
+    None om biletet manglar eller ikkje passar den lokale CSV-en, og når
+    skattedata.py alt har henta ei anna liste frå nett.
+    """
+    lokal = Path(datasett.lokal)
+    try:
+        sha = _sha256(lokal)
+    except OSError:
+        return None
+    if _gjeldande.get(datasett.url, sha) != sha:
+        return None
+    return les_bilete(sti_for(lokal), sha, datasett.klassar, datasett.std_bunnfradrag)
+
+
+def meld_gjeldande(url, sha256):
+    """Kalla av skattedata.py når lista for `url` blir lasta eller bytt ut."""
+    _gjeldande[url] = sha256
@@ -0,0 +1,145 @@
+"""Tidtaking og minnebruk per steg i éi køyring av app.py.
+
+Slått av som standard, og berre den som startar serveren kan slå det på,
+med KALKULATOR_PROFIL=1. Då blir kvart namngitt steg målt med perf_counter.
+Tracemalloc og toppen hans er felles for prosessen, så berre éi køyring om
+gongen får minnetal; andre køyringar samstundes får berre tider. Tracemalloc
+blir stoppa og logghandsamaren fjerna når den siste profilerte køyringa er
+ferdig.
+
+Kvar køyring blir logga som éi JSON-linje til loggaren "kalkulator.profil",
+og summane over alle køyringar kan hentast i Prometheus-tekstformat.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+logg = logging.getLogger("kalkulator.profil")
+
+
+@dataclass(frozen=True)
+class Steg:
+    namn: str
+    sekund: float
+    netto: int | None   # byte allokert i steget og ikkje frigjort; None utan minnetal
+    topp: int | None    # høgaste allokering over starten av steget, i byte
+
+
+class Profil:
+    """Steg målt i éi køyring. Ein inaktiv profil måler ingenting.
+
+    Alt profilen har sett opp blir rydda i avslutt, eller når profilen blir
+    kasta om køyringa stoppar før det.
+    """
+
+    def __init__(self, aktiv):
+        self.aktiv = aktiv
+        self.målingar = []
+        self._start = time.perf_counter()
+        self.minne = aktiv and _minne.acquire(blocking=False)
+        if not aktiv:
+            return
+        starta = self.minne and not tracemalloc.is_tracing()
+        if starta:
+            tracemalloc.start()
+        _opne()
+        self._rydd = weakref.finalize(self, _lukk, self.minne, starta)
+
+    @contextmanager
+    def steg(self, namn):
+        """Mål blokka under `namn`."""
+        if not self.aktiv:
+            yield
+            return
+        if self.minne:
+            før, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            sekund = time.perf_counter() - t
+            if self.minne:
+                etter, topp = tracemalloc.get_traced_memory()
+                self.målingar.append(Steg(namn, sekund, etter - før, max(topp - før, 0)))
+            else:
+                self.målingar.append(Steg(namn, sekund, None, None))
+
+    @property
+    def total(self):
+        """Sekund sidan køyringa starta."""
+        return time.perf_counter() - self._start
+
+    def avslutt(self):
+        """Logg køyringa, legg ho til i summane for Prometheus og rydd opp."""
+        if not self.aktiv or not self._rydd.alive:
+            return
+        logg.info(json.dumps({"total": self.total, "steg": [asdict(s) for s in self.målingar]},
+                             ensure_ascii=False))
+        with _lås:
+            for s in self.målingar:
+                antal, sekund, topp = _summar.get(s.namn, (0, 0.0, 0))
+                _summar[s.namn] = (antal + 1, sekund + s.sekund, max(topp, s.topp or 0))
+        self._rydd()
+
+
+_summar = {}               # steg -> (antal, sum sekund, høgaste topp i byte)
+_lås = threading.Lock()    # _summar, _aktive og _handsamar
+_minne = threading.Lock()  # halden av køyringa som får minnetal
+_aktive = 0                # profilerte køyringar som ikkje er ferdige
+_handsamar = None          # lagt til av profil.py, fjerna når _aktive er 0
+
+
+def _opne():
+    global _aktive, _handsamar
+    with _lås:
+        _aktive += 1
+        if _aktive == 1 and not logg.handlers:
+            # JSON-linjene til stderr med mindre loggaren er sett opp på anna vis
+            _handsamar = logging.StreamHandler()
+            logg.addHandler(_handsamar)
+            logg.setLevel(logging.INFO)
+
+
+def _lukk(minne, starta):
+    global _aktive, _handsamar
+    if starta:
+        tracemalloc.stop()
+    if minne:
+        _minne.release()
+    with _lås:
+        _aktive -= 1
+        if _aktive == 0 and _handsamar is not None:
+            logg.removeHandler(_handsamar)
+            _handsamar = None
+
+
+def profil():
+    """Ny profil for ei køyring, aktiv berre om KALKULATOR_PROFIL=1."""
+    return Profil(os.environ.get("KALKULATOR_PROFIL") == "1")
+
+
+def prometheus():
+    """Summane over alle profilerte køyringar i Prometheus-tekstformat."""
+    with _lås:
+        summar = dict(_summar)
+    linjer = [
+        "# HELP kalkulator_steg_sekund Tid brukt i steg i app.py.",
+        "# TYPE kalkulator_steg_sekund summary",
+    ]
+    for namn, (antal, sekund, _) in sorted(summar.items()):
+        linjer.append(f'kalkulator_steg_sekund_sum{{steg="{namn}"}} {sekund:.6f}')
+        linjer.append(f'kalkulator_steg_sekund_count{{steg="{namn}"}} {antal}')
+    linjer += [
+        "# HELP kalkulator_steg_topp_byte Høgaste allokering i steget.",
+        "# TYPE kalkulator_steg_topp_byte gauge",
+    ]
+    for namn, (_, _, topp) in sorted(summar.items()):
+        linjer.append(f'kalkulator_steg_topp_byte{{steg="{namn}"}} {topp}')
+    return "\n".join(linjer) + "\n"
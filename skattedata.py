@@ -0,0 +1,424 @@
+"""Lasting av skattelista, delt mellom alle økter i same prosess.
+
+Streamlit køyrer app.py på nytt ved kvar endring, men modulane blir berre
+importerte éin gong. Lista blir difor henta, validert og konvertert til tal
+éin gong her, og alle økter les same ferdige tabell.
+"""
+import hashlib
+import io
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from analyse import takstfordelingar, verknad
+from datasett import DATASETT, LOKAL_CSV, STANDARD_DATASETT, URL
+from eigedomssok import Eigedomssok
+from framlegg import resultat
+from oppstart import les_bilete, meld_gjeldande, skriv_bilete, sti_for
+from skattemotor import KLASSESATSAR, STD_BUNNFRADRAG, Eigedomar, Grunnlagsindeks, berekn_kube
+from usikkerheit import mistenkte, simuler
+from validering import rapport, valider
+
+LOKAL_ARTEFAKT = LOKAL_CSV.with_suffix(".feather")   # typa kopi frå data/loaddata.py
+
+KOLONNAR = ["Adresse", "Eiendom", "Takst", "Skattenivå", "Bunnfradrag", "Grunnlag", "Promillesats", "Skatt", "Fritak"]
+TALKOLONNAR = ["Takst", "Skattenivå", "Bunnfradrag", "Grunnlag", "Promillesats", "Skatt"]
+# kompakte typar når verdiane tillèt det; Promillesats og Fritak blir kategoriar
+HELTAL = {"Takst": np.int64, "Skattenivå": np.uint8, "Bunnfradrag": np.int64,
+          "Grunnlag": np.int64, "Skatt": np.int64}
+
+MAKS_ALDER = 600     # sekund før vi spør GitHub om fila er endra
+TIDSAVBROT = 10      # sekund før vi gir opp nedlastinga og brukar lokal kopi
+MINNEBUDSJETT = 512 * 2**20  # byte for bufra lister; minst brukte blir kasta først
+VERKNAD_BUFFER = 64  # politikkar med ferdig fordelingsanalyse per liste
+SIMULERING_BUFFER = 16  # (politikk, scenario) med ferdig Monte Carlo-simulering per liste
+RESULTAT_BUFFER = 256  # framlegg med ferdig samandrag per liste; delte lenkjer blir treff her
+
+
+@dataclass(eq=False)
+class Skatteliste:
+    """Ferdig konvertert skatteliste. `df` er delt og skal ikkje endrast.
+
+    Talkolonnane er heiltal (Skattenivå uint8) når verdiane tillèt det,
+    Promillesats og Fritak er kategoriar. "Feil" er bitmaska frå validering.py.
+    """
+    df: pd.DataFrame
+    kjelde: str
+    sha256: str
+    etag: str | None
+    sjekka: float
+    klassar: tuple = tuple(KLASSESATSAR.items())
+    std_bunnfradrag: int = STD_BUNNFRADRAG
+
+    @cached_property
+    def eigedomar(self):
+        """Talkolonnane som NumPy-tabellar for skattemotoren."""
+        return Eigedomar.frå_df(self.df, dict(self.klassar), self.std_bunnfradrag)
+
+    @cached_property
+    def klasse(self):
+        """Eigedomsklassen per rad som kategori; "annan" for rader utan klasse."""
+        e = self.eigedomar
+        kategoriar = [*e.klassar, "annan"]
+        # -1 (utan klasse) peikar på siste kategori
+        return pd.Categorical.from_codes(np.where(e.klasse < 0, len(e.klassar), e.klasse),
+                                         categories=kategoriar)
+
+    @cached_property
+    def inntektskube(self):
+        """Total skatt for heile rutenettet av slider-verdiar."""
+        return berekn_kube(self.eigedomar)
+
+    @cached_property
+    def grunnlagsindeks(self):
+        """Sorterte grunnlag for oppslag på vilkårlege satsar og frådrag."""
+        return Grunnlagsindeks(self.eigedomar)
+
+    @cached_property
+    def takstfordelingar(self):
+        """Sorterte takstar per eigedomsklasse, for kvantil utan ny berekning."""
+        return takstfordelingar(self.eigedomar)
+
+    @cached_property
+    def skatt_dagens(self):
+        """Skatt i lista (kr) som NumPy-tabell."""
+        a = self.df["Skatt"].to_numpy(dtype=float)
+        a.setflags(write=False)
+        return a
+
+    @cached_property
+    def total_skatt_dagens(self):
+        """Sum skatt i lista for eigedomar utan fritak."""
+        return int(self.skatt_dagens[self.eigedomar.utan_fritak].sum())
+
+    @cached_property
+    def _verknader(self):
+        return OrderedDict()
+
+    def verknad(self, politikk):
+        """Fordeling av skatteendringa for `politikk`, bufra for dei siste politikkane."""
+        return _bufra(self._verknader, politikk, VERKNAD_BUFFER,
+                      lambda: verknad(self.eigedomar, self.skatt_dagens, politikk))
+
+    @cached_property
+    def _resultat(self):
+        return OrderedDict()
+
+    def resultat(self, politikk):
+        """Samandrag av `politikk` for samanlikninga, bufra for dei siste framlegga."""
+        return _bufra(self._resultat, politikk, RESULTAT_BUFFER,
+                      lambda: resultat(self.eigedomar, self.skatt_dagens, politikk))
+
+    @cached_property
+    def feil(self):
+        """Bitmaske frå validering.py per rad; 0 for rader utan avvik."""
+        a = self.df["Feil"].to_numpy(dtype=np.uint16)
+        a.setflags(write=False)
+        return a
+
+    @cached_property
+    def feilrapport(self):
+        """Rader med avvik, sjå validering.rapport."""
+        return rapport(self.df)
+
+    @cached_property
+    def mistenkte(self):
+        """Rader som truleg vart feil tolka frå PDF-en (sjå usikkerheit.MISTENKTE_KONTROLLAR)."""
+        a = mistenkte(self.feil)
+        a.setflags(write=False)
+        return a
+
+    @cached_property
+    def delvis_fritak(self):
+        """Rader med delvis fritak, som motoren skattlegg fullt."""
+        a = self.df["Fritak"].astype(str).str.contains("delvis").to_numpy(dtype=bool)
+        a.setflags(write=False)
+        return a
+
+    @cached_property
+    def _simuleringar(self):
+        return OrderedDict()
+
+    def usikkerheit(self, politikk, scenario):
+        """Monte Carlo-simulering av total skatt, bufra for dei siste vala."""
+        return _bufra(self._simuleringar, (politikk, scenario), SIMULERING_BUFFER,
+                      lambda: simuler(self.eigedomar, self.mistenkte, self.delvis_fritak, politikk, scenario))
+
+    @cached_property
+    def eigedomssok(self):
+        """Søkeindeks over adresse og matrikkelnummer."""
+        return Eigedomssok(self.df)
+
+    @cached_property
+    def df_storleik(self):
+        return int(self.df.memory_usage(deep=True).sum())
+
+    def storleik(self):
+        """Omtrentleg minnebruk i byte, med dei avleidde tabellane som er bygde."""
+        return self.df_storleik + sum(_nbytes(v) for k, v in vars(self).items() if k != "df")
+
+
+def _bufra(buffer, nøkkel, maks, lag):
+    """Slå opp `nøkkel` i LRU-bufferet, eller lag verdien utan lås og legg han inn."""
+    with _lås:
+        v = buffer.get(nøkkel)
+        if v is not None:
+            buffer.move_to_end(nøkkel)
+            return v
+    v = lag()
+    with _lås:
+        buffer[nøkkel] = v
+        while len(buffer) > maks:
+            buffer.popitem(last=False)
+    return v
+
+
+def _nbytes(obj, djupn=2):
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (list, tuple)):
+        return sum(_nbytes(x, djupn) for x in obj)
+    if djupn and hasattr(obj, "__dict__"):
+        return sum(_nbytes(v, djupn - 1) for v in vars(obj).values())
+    return 0
+
+
+_buffer: OrderedDict[str, Skatteliste] = OrderedDict()   # minst brukte først
+_lås = threading.Lock()   # _buffer og dei andre buffera; aldri halden over nett eller tolking
+_hentelås = {}            # url: Lock, så berre éin tråd om gongen hentar og tolkar kvar liste
+
+
+def _hent(url, etag=None):
+    """Hent url; return (innhald, etag), eller (None, etag) om fila er uendra."""
+    req = urllib.request.Request(url)
+    if etag:
+        req.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(req, timeout=TIDSAVBROT) as resp:
+            return resp.read(), resp.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag
+        raise
+
+
+def tolk_csv(raw):
+    """Les CSV-bytes og gjer om talkolonnane til tal éin gong."""
+    return konverter(les_csv(raw))
+
+
+def les_csv(raw):
+    """Les CSV-bytes som tekst og sjekk at kolonnane finst."""
+    df = pd.read_csv(
+        io.BytesIO(raw),
+        dtype=str,
+        sep=",",
+        on_bad_lines="skip",  # HOPP OVER TOMME/STØY-LINJER
+        encoding="utf-8-sig"  # TAR HÅND OM BOM-FILER
+    )
+    manglar = [k for k in KOLONNAR if k not in df.columns]
+    if manglar:
+        raise ValueError(f"Skattelista manglar kolonnar: {', '.join(manglar)}")
+    if df.empty:
+        raise ValueError("Skattelista er tom")
+    return df
+
+
+def konverter(df):
+    """Gjer om talkolonnane i ei tekstliste frå les_csv til tal, på staden.
+
+    Kontrollane i validering.py blir køyrde her, medan teksten finst, og
+    lagra som bitmaske i kolonnen "Feil".
+    """
+    tekst = df[TALKOLONNAR].copy()
+    # --- Tvungen tallkonvertering ---
+    for col in TALKOLONNAR:
+        df[col] = (
+            df[col]
+            .fillna("")   # astype(str) gjer NaN til "nan" i pandas 2, men ikkje i pandas 3
+            .astype(str)
+            .str.replace(" ", "")
+            .str.replace(",", ".")
+            .str.extract(r"([0-9\.]+)", expand=False)  # hent kun tall og punktum
+            .fillna("0")
+            .astype(float)
+        )
+    df["Fritak"] = df["Fritak"].fillna("").astype(str).str.strip().str.lower()
+    # tom adresse som "", så Feather-artefaktet (None) og CSV-en (NaN) gir same tabell
+    df["Adresse"] = df["Adresse"].fillna("")
+    df["Feil"] = valider(tekst, df)
+    return _kompakt(df)
+
+
+def _kompakt(df):
+    """Gjer om til heiltal og kategoriar der det ikkje mistar informasjon."""
+    for col, dtype in HELTAL.items():
+        a = df[col].to_numpy()
+        info = np.iinfo(dtype)
+        if (a == np.round(a)).all() and a.min() >= info.min and a.max() <= info.max:
+            df[col] = a.astype(dtype)
+    df["Promillesats"] = df["Promillesats"].astype("category")
+    df["Fritak"] = df["Fritak"].astype("category")
+    return df
+
+
+def skriv_artefakt(raw, sti=LOKAL_ARTEFAKT):
+    """Tolk CSV-bytes og skriv resultatet som ukomprimert Feather-fil.
+
+    sha256 av CSV-en blir lagra i metadata, så lastinga kan sjå om
+    artefaktet høyrer til den CSV-en ho har fått. Return den tolka lista.
+    """
+    df = tolk_csv(raw)
+    tabell = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(tabell.schema.metadata or {})
+    metadata[b"sha256"] = hashlib.sha256(raw).hexdigest().encode()
+    feather.write_feather(tabell.replace_schema_metadata(metadata), sti, compression="uncompressed")
+    return df
+
+
+def les_artefakt(sti, sha256):
+    """Les artefaktet minnekartlagt om det finst og høyrer til `sha256`, elles None."""
+    try:
+        tabell = feather.read_table(sti, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if (tabell.schema.metadata or {}).get(b"sha256", b"").decode() != sha256:
+        return None
+    if "Feil" not in tabell.column_names:   # skrive før kontrollane fanst
+        return None
+    # talkolonnar utan manglande verdiar blir delte med kartet, ikkje kopierte
+    return tabell.to_pandas(split_blocks=True)
+
+
+def skriv_oppstart(raw, df, sti=sti_for(LOKAL_CSV)):
+    """Skriv oppstartsbiletet (sjå oppstart.py) for den tolka lista `df` frå CSV-en `raw`."""
+    s = Skatteliste(df, str(sti), hashlib.sha256(raw).hexdigest(), None, 0.0)
+    skriv_bilete(sti, s.sha256, s.eigedomar, s.inntektskube, s.skatt_dagens)
+
+
+def _tolk(raw, sha256, artefakt):
+    df = les_artefakt(artefakt, sha256)
+    return tolk_csv(raw) if df is None else df
+
+
+def _ny(raw, sha256, lokal, kjelde, etag, sjekka, **oppsett):
+    """Tolka Skatteliste, med tabellane frå oppstartsbiletet til `lokal` om det høyrer til same innhald."""
+    s = Skatteliste(_tolk(raw, sha256, Path(lokal).with_suffix(".feather")), kjelde, sha256, etag, sjekka,
+                    **oppsett)
+    bilete = les_bilete(sti_for(lokal), sha256, s.klassar, s.std_bunnfradrag)
+    if bilete is not None:
+        # cached_property les frå __dict__, så desse blir ikkje rekna ut på nytt
+        vars(s).update(eigedomar=bilete.eigedomar, inntektskube=bilete.inntektskube,
+                       skatt_dagens=bilete.skatt_dagens)
+    return s
+
+
+def _frå_fil(sti, **oppsett):
+    raw = Path(sti).read_bytes()
+    return _ny(raw, hashlib.sha256(raw).hexdigest(), sti, str(sti), None, time.time(), **oppsett)
+
+
+def _rydd():
+    """Kast minst brukte lister til resten er innanfor MINNEBUDSJETT."""
+    while len(_buffer) > 1 and sum(s.storleik() for s in _buffer.values()) > MINNEBUDSJETT:
+        _buffer.popitem(last=False)
+
+
+def _set_inn(url, ny, sjekka):
+    with _lås:
+        ny.sjekka = sjekka
+        _buffer[url] = ny
+        _buffer.move_to_end(url)
+        meld_gjeldande(url, ny.sha256)
+        _rydd()
+
+
+def last_skatteliste(url=URL, lokal=LOKAL_CSV, maks_alder=MAKS_ALDER,
+                     klassar=tuple(KLASSESATSAR.items()), std_bunnfradrag=STD_BUNNFRADRAG):
+    """Return skattelista for `url`, henta og tolka berre når innhaldet er nytt.
+
+    Innanfor `maks_alder` sekund blir bufra liste returnert utan nettverk.
+    Etter det spør vi med ETag, og samanliknar sha256 av innhaldet før vi
+    tolkar på nytt. Utan nett blir førre versjon, eller `lokal`, brukt.
+    Finst det eit artefakt frå data/loaddata.py for same innhald, blir det
+    lese i staden for å tolke CSV-en. `klassar` og `std_bunnfradrag` er
+    som i Datasett.
+
+    Ved kald start blir `lokal` returnert med ein gong om han finst, og
+    nettet blir sjekka i ein bakgrunnstråd, så første visning ikkje ventar
+    på GitHub.
+
+    Nettverk og tolking skjer utan _lås, så andre lister og buffera i
+    Skatteliste ikkje ventar på GitHub; låsen blir berre teken for å byte
+    inn den nye lista.
+    """
+    oppsett = {"klassar": klassar, "std_bunnfradrag": std_bunnfradrag}
+    with _lås:
+        gammal = _buffer.get(url)
+        if gammal is not None:
+            _buffer.move_to_end(url)
+            if time.time() - gammal.sjekka < maks_alder:
+                return gammal
+        hentelås = _hentelås.setdefault(url, threading.Lock())
+
+    with hentelås:
+        # ein annan tråd kan ha henta lista medan vi venta
+        with _lås:
+            gammal = _buffer.get(url)
+        nå = time.time()
+        if gammal is not None and nå - gammal.sjekka < maks_alder:
+            return gammal
+        if gammal is None and Path(lokal).exists():
+            ny = _frå_fil(lokal, **oppsett)
+            _set_inn(url, ny, nå - maks_alder)  # forelda, så neste kall også sjekkar nettet
+            # tråden ventar på hentelåsen til vi er ferdige her
+            threading.Thread(target=last_skatteliste, args=(url, lokal, maks_alder, klassar, std_bunnfradrag),
+                             daemon=True).start()
+            return ny
+
+        ny = gammal
+        try:
+            raw, etag = _hent(url, gammal.etag if gammal else None)
+        except (urllib.error.URLError, OSError):
+            raw = None
+        else:
+            if raw is not None:
+                sha = hashlib.sha256(raw).hexdigest()
+                if gammal is not None and sha == gammal.sha256:
+                    gammal.etag = etag
+                else:
+                    try:
+                        ny = _ny(raw, sha, lokal, url, etag, nå, **oppsett)
+                    except (ValueError, UnicodeDecodeError, pd.errors.ParserError):
+                        pass  # øydelagd fil på nett: behald det vi har
+
+        if ny is None:
+            ny = _frå_fil(lokal, **oppsett)
+        # same objekt så lenge innhaldet er uendra, så avleidde tabellar blir verande
+        _set_inn(url, ny, nå)
+        return ny
+
+
+def last_datasett(datasett_id=STANDARD_DATASETT, maks_alder=MAKS_ALDER):
+    """Return skattelista for eit datasett i DATASETT, lasta første gong ho blir bedd om."""
+    d = DATASETT[datasett_id]
+    return last_skatteliste(d.url, d.lokal, maks_alder, d.klassar, d.std_bunnfradrag)
+
+
+def invalider(url=None):
+    """Tving ny henting ved neste kall, for `url` eller for alle."""
+    with _lås:
+        if url is None:
+            _buffer.clear()
+        else:
+            _buffer.pop(url, None)
@@ -0,0 +1,407 @@
+"""Berekning av eigedomsskatt på NumPy-tabellar, utan Streamlit.
+
+Motoren les berre tabellane i `Eigedomar` og endrar aldri skattelista, så
+same `Eigedomar` kan delast mellom økter og brukast til mange politikkar.
+"""
+from dataclasses import dataclass, replace
+from functools import cached_property
+
+import numpy as np
+
+BOLIG_PROMILLE = 1.9       # sats i 2025 som kjenneteiknar bolig
+NAERING_PROMILLE = 4.0     # sats i 2025 som kjenneteiknar næring
+STD_BUNNFRADRAG = 200000   # eigedomar med dette frådraget får nytt botnfrådrag
+# Eigedomsklassar i Malvik 2025 og satsen i lista som kjenneteiknar kvar av dei.
+# Andre kommunar kan ha fleire, t.d. {"verk_og_bruk": 7.0, "kraftanlegg": 5.5}.
+# Klassen blir lesen frå satsen, så to klassar kan ikkje ha same sats (sjå
+# sjekk_klassesatsar); rader som ikkje passar nokon klasse held satsen sin.
+KLASSESATSAR = {"bolig": BOLIG_PROMILLE, "naering": NAERING_PROMILLE}
+KLASSENAMN = {"bolig": "bolig", "naering": "næring", "verk_og_bruk": "verk og bruk",
+              "kraftanlegg": "kraftanlegg"}
+MINSTE_SKATT = 300         # skatt under dette blir ikkje kravd inn
+
+# Verdiane sliderane i app.py kan gi; round() gir same float som sliderane
+BOLIG_SATSAR = np.array([round(i / 10, 1) for i in range(41)])        # 0–4.0 ‰
+NAERING_SATSAR = np.array([round(i / 10, 1) for i in range(71)])      # 0–7.0 ‰
+BUNNFRADRAG = np.arange(0, 2_000_001, 100_000, dtype=float)           # 0–2 mill.
+
+RADBLOKK = 1024            # rader per blokk i rutenett-berekninga
+BISEKSJON_STEG = 40        # halveringar; 2 mill. / 2**40 er under ei krone
+
+
+@dataclass(frozen=True)
+class Politikk:
+    """Satsar i promille og botnfrådrag i kr.
+
+    `skatteniva` (prosent) overstyrer skattenivået i lista for alle
+    eigedomar; None brukar verdien frå lista.
+    """
+    bolig_sats: float
+    naering_sats: float
+    bunnfradrag: float
+    skatteniva: float | None = None
+    satsar: tuple = ()     # ((klasse, sats), ...) for andre klassar enn bolig og næring
+
+    def satstabell(self, klassar, standard):
+        """Sats per klasse i `klassar`; klassar politikken ikkje set, held `standard`."""
+        # bolig_sats og naering_sats går føre ein bolig- eller naering-nøkkel i satsar
+        satsar = {**dict(self.satsar), "bolig": self.bolig_sats, "naering": self.naering_sats}
+        return np.array([satsar.get(k, s) for k, s in zip(klassar, standard)], dtype=float)
+
+
+def sjekk_klassesatsar(klassesatsar):
+    """ValueError om to klassar i `klassesatsar` ({klasse: sats}) har same sats."""
+    klassar = {}
+    for klasse, sats in klassesatsar.items():
+        klassar.setdefault(round(float(sats), 9), []).append(klasse)
+    like = [k for k in klassar.values() if len(k) > 1]
+    if like:
+        raise ValueError("klassane blir kjende att på satsen, men "
+                         + "; ".join(" og ".join(k) for k in like) + " har same sats")
+
+
+@dataclass(frozen=True, eq=False)
+class Eigedomar:
+    """Skattelista som skrivebeskytta NumPy-tabellar, éin rad per eigedom.
+
+    `klasse` er indeksen i `klassar` for kvar rad, eller -1 for rader som
+    held satsen sin. `klassesatsar` er satsen kvar klasse har i lista.
+    """
+    takst: np.ndarray
+    skatteniva: np.ndarray
+    bunnfradrag: np.ndarray
+    promillesats: np.ndarray
+    klasse: np.ndarray
+    nytt_bunnfradrag: np.ndarray
+    utan_fritak: np.ndarray
+    klassar: tuple
+    klassesatsar: np.ndarray
+    std_bunnfradrag: float
+
+    @classmethod
+    def frå_df(cls, df, klassesatsar=KLASSESATSAR, std_bunnfradrag=STD_BUNNFRADRAG):
+        """Bygg tabellane éin gong frå ein konvertert skatteliste-DataFrame.
+
+        Kvar rad får klassen i `klassesatsar` ({klasse: sats}) med same sats,
+        og nytt botnfrådrag om frådraget i lista er `std_bunnfradrag`.
+        ValueError om to klassar har same sats.
+        """
+        sjekk_klassesatsar(klassesatsar)
+        def tabell(a):
+            a = np.ascontiguousarray(a)
+            a.setflags(write=False)
+            return a
+
+        promille = df["Promillesats"].to_numpy(dtype=float)
+        bunn = df["Bunnfradrag"].to_numpy(dtype=float)
+        satsar = np.array(list(klassesatsar.values()), dtype=float)
+        lik = np.isclose(promille[:, None], satsar[None, :], rtol=0, atol=1e-9)
+        klasse = np.where(lik.any(axis=1), lik.argmax(axis=1), -1).astype(np.int8)
+        return cls(
+            takst=tabell(df["Takst"].to_numpy(dtype=float)),
+            skatteniva=tabell(df["Skattenivå"].to_numpy(dtype=float)),
+            bunnfradrag=tabell(bunn),
+            promillesats=tabell(promille),
+            klasse=tabell(klasse),
+            nytt_bunnfradrag=tabell(bunn == std_bunnfradrag),
+            utan_fritak=tabell((df["Fritak"] == "ingen").to_numpy(dtype=bool)),
+            klassar=tuple(klassesatsar),
+            klassesatsar=tabell(satsar),
+            std_bunnfradrag=float(std_bunnfradrag),
+        )
+
+    def __len__(self):
+        return len(self.takst)
+
+    def er(self, klasse):
+        """Boolsk tabell for rader i `klasse`; berre usanne om lista ikkje har klassen."""
+        if klasse not in self.klassar:
+            return np.zeros(len(self), dtype=bool)
+        return self.klasse == self.klassar.index(klasse)
+
+    @cached_property
+    def er_bolig(self):
+        return self.er("bolig")
+
+    @cached_property
+    def er_naering(self):
+        return self.er("naering")
+
+    def overstyr(self, rader, takst=None, skatteniva=None, bunnfradrag=None):
+        """Return ein kopi der `rader` har fått nye verdiar; sjølve lista blir ikkje endra."""
+        def ny(a, verdi):
+            if verdi is None:
+                return a
+            a = a.copy()
+            a[rader] = verdi
+            a.setflags(write=False)
+            return a
+
+        nytt = None if bunnfradrag is None else np.asarray(bunnfradrag) == self.std_bunnfradrag
+        return replace(
+            self,
+            takst=ny(self.takst, takst),
+            skatteniva=ny(self.skatteniva, skatteniva),
+            bunnfradrag=ny(self.bunnfradrag, bunnfradrag),
+            nytt_bunnfradrag=ny(self.nytt_bunnfradrag, nytt),
+        )
+
+
+def skatt_per_eigedom(eigedomar, politikk):
+    """Return ny skatt per eigedom i heile kroner (int64)."""
+    return _avrund(skatt_urunda(eigedomar, politikk))
+
+
+def satsar_per_rad(eigedomar, politikk):
+    """Return (promille, bunnfradrag, skattenivå) per rad med `politikk`."""
+    e = eigedomar
+    # satsen per klasse er ein liten tabell; rader utan klasse (-1) held sin eigen
+    satsar = politikk.satstabell(e.klassar, e.klassesatsar)
+    promille = np.where(e.klasse < 0, e.promillesats, satsar.take(e.klasse, mode="clip"))
+    bunn = np.where(e.nytt_bunnfradrag, politikk.bunnfradrag, e.bunnfradrag)
+    niva = e.skatteniva if politikk.skatteniva is None else np.full(len(e), float(politikk.skatteniva))
+    return promille, bunn, niva
+
+
+def skatt_urunda(eigedomar, politikk):
+    """Return ny skatt per eigedom før minstegrense og avrunding (float)."""
+    e = eigedomar
+    promille, bunn, niva = satsar_per_rad(e, politikk)
+
+    grunnlag = e.takst * (niva / 100) - bunn
+    np.maximum(grunnlag, 0, out=grunnlag)
+    return grunnlag * (promille / 1000)
+
+
+def total_skatt(eigedomar, politikk):
+    """Return sum ny skatt i kr for alle eigedomar i lista."""
+    return int(skatt_per_eigedom(eigedomar, politikk).sum())
+
+
+def _avrund(skatt):
+    """Minstegrense, ugyldige verdiar og avrunding, som i skatt_per_eigedom."""
+    skatt[skatt < MINSTE_SKATT] = 0
+    skatt[~np.isfinite(skatt)] = 0
+    return np.round(skatt).astype(np.int64)
+
+
+def _klassetabell(takst, niva, bunn, nytt_bunn, satsar, bunnfradrag):
+    """Sum skatt for rader med felles sats, som tabell (sats, botnfrådrag).
+
+    Rekna i blokker av rader så minnebruken er avgrensa. Kvar celle blir
+    rekna med same operasjonar som skatt_per_eigedom, så summane er eksakte.
+    """
+    ut = np.zeros((len(satsar), len(bunnfradrag)), dtype=np.int64)
+    faktor = (satsar / 1000)[:, None, None]
+    for start in range(0, len(takst), RADBLOKK):
+        blokk = slice(start, start + RADBLOKK)
+        b = np.where(nytt_bunn[blokk], bunnfradrag[:, None], bunn[blokk])
+        grunnlag = takst[blokk] * (niva[blokk] / 100) - b
+        np.maximum(grunnlag, 0, out=grunnlag)
+        ut += _avrund(grunnlag * faktor).sum(axis=2)
+    return ut
+
+
+@dataclass(frozen=True, eq=False)
+class Inntektskube:
+    """Total skatt for alle kombinasjonar av bolig-, næringssats og botnfrådrag.
+
+    Inntekta er ein sum over eigedomsklassar, så kuben blir lagra som éin
+    tabell per klasse: `bolig[i, k] + naering[j, k] + andre[k]` er total
+    skatt for bolig_satsar[i], naering_satsar[j] og bunnfradrag[k].
+    """
+    bolig_satsar: np.ndarray
+    naering_satsar: np.ndarray
+    bunnfradrag: np.ndarray
+    bolig: np.ndarray
+    naering: np.ndarray
+    andre: np.ndarray
+
+    @cached_property
+    def kube(self):
+        """Heile kuben som tabell (bolig_sats, naering_sats, bunnfradrag)."""
+        return self.bolig[:, None, :] + self.naering[None, :, :] + self.andre
+
+    @staticmethod
+    def _indeks(akse, verdi, namn):
+        treff = np.flatnonzero(np.isclose(akse, verdi))
+        if len(treff) == 0:
+            raise ValueError(f"{namn}={verdi} er utanfor rutenettet")
+        return int(treff[0])
+
+    def total(self, bolig_sats, naering_sats, bunnfradrag):
+        """Slå opp total skatt i kr. ValueError om verdiane ikkje er i rutenettet."""
+        i = self._indeks(self.bolig_satsar, bolig_sats, "bolig_sats")
+        j = self._indeks(self.naering_satsar, naering_sats, "naering_sats")
+        k = self._indeks(self.bunnfradrag, bunnfradrag, "bunnfradrag")
+        return int(self.bolig[i, k] + self.naering[j, k] + self.andre[k])
+
+    def flate(self, naering_sats):
+        """Total skatt som tabell (bolig_sats, bunnfradrag) ved gitt næringssats."""
+        j = self._indeks(self.naering_satsar, naering_sats, "naering_sats")
+        return self.bolig + self.naering[j] + self.andre
+
+    def noytralt_bunnfradrag(self, bolig_sats, naering_sats, mål):
+        """Botnfrådraget som gir inntekt nærast `mål` ved gitte satsar.
+
+        Return (bunnfradrag, total).
+        """
+        i = self._indeks(self.bolig_satsar, bolig_sats, "bolig_sats")
+        totalar = self.flate(naering_sats)[i]
+        k = int(np.argmin(np.abs(totalar - mål)))
+        return float(self.bunnfradrag[k]), int(totalar[k])
+
+
+def berekn_kube(eigedomar, bolig_satsar=BOLIG_SATSAR, naering_satsar=NAERING_SATSAR,
+                bunnfradrag=BUNNFRADRAG, skatteniva=None):
+    """Rekn ut skatt for heile rutenettet av politikkar i éi samla berekning.
+
+    Klassar utanom bolig og næring har satsen dei har i lista, så kuben
+    gjeld berre politikkar utan `satsar`.
+    """
+    e = eigedomar
+    bolig_satsar = np.asarray(bolig_satsar, dtype=float)
+    naering_satsar = np.asarray(naering_satsar, dtype=float)
+    bunnfradrag = np.asarray(bunnfradrag, dtype=float)
+    niva = e.skatteniva if skatteniva is None else np.full(len(e), float(skatteniva))
+
+    def klasse(maske, satsar):
+        return _klassetabell(e.takst[maske], niva[maske], e.bunnfradrag[maske],
+                             e.nytt_bunnfradrag[maske], satsar, bunnfradrag)
+
+    # eigedomar som verken er bolig eller næring held satsen i lista
+    andre = ~(e.er_bolig | e.er_naering)
+    andre_tabell = np.zeros(len(bunnfradrag), dtype=np.int64)
+    for sats in np.unique(e.promillesats[andre]):
+        maske = andre & (e.promillesats == sats)
+        andre_tabell += klasse(maske, np.array([sats]))[0]
+
+    return Inntektskube(
+        bolig_satsar=bolig_satsar,
+        naering_satsar=naering_satsar,
+        bunnfradrag=bunnfradrag,
+        bolig=klasse(e.er_bolig, bolig_satsar),
+        naering=klasse(e.er_naering, naering_satsar),
+        andre=andre_tabell,
+    )
+
+
+@dataclass(frozen=True, eq=False)
+class _Gruppe:
+    sats: float | None       # sats i lista; None for bolig og næring, som alltid kjem frå politikken
+    klasse: str | None       # klassen i Eigedomar.klassar, eller None for rader som held satsen
+    nytt_bunnfradrag: bool
+    grunnlag: np.ndarray     # sortert stigande
+    prefiks: np.ndarray      # prefiks[k] = sum(grunnlag[:k])
+
+
+class Grunnlagsindeks:
+    """Sorterte grunnlag med prefikssummar for oppslag i O(log n).
+
+    For ei gruppe med sats r og botnfrådrag B betaler eigedom i skatt
+    (g_i - B) * r / 1000 når g_i >= B + 300 * 1000 / r, elles ingenting.
+    Med g sortert er dette eit binærsøk og to oppslag i prefikssummen.
+
+    Svaret er ikkje avrunda per eigedom, så det kan avvike frå
+    total_skatt (referansen) med inntil 0,5 kr per eigedom som betaler skatt.
+    """
+
+    def __init__(self, eigedomar, skatteniva=None):
+        e = eigedomar
+        niva = e.skatteniva if skatteniva is None else float(skatteniva)
+        brutto = e.takst * (niva / 100)
+        grupper = []
+
+        def legg_til(maske, sats, klasse):
+            for nytt in (True, False):
+                m = maske & (e.nytt_bunnfradrag == nytt)
+                # eigedomar med fast frådrag kan trekkjast frå alt no
+                g = brutto[m] if nytt else np.maximum(brutto[m] - e.bunnfradrag[m], 0)
+                g = np.sort(g[np.isfinite(g)])
+                if len(g):
+                    prefiks = np.concatenate(([0.0], np.cumsum(g)))
+                    grupper.append(_Gruppe(sats, klasse, nytt, g, prefiks))
+
+        legg_til(e.er_bolig, None, "bolig")
+        legg_til(e.er_naering, None, "naering")
+        for i, klasse in enumerate(e.klassar):
+            if klasse not in ("bolig", "naering"):
+                legg_til(e.klasse == i, float(e.klassesatsar[i]), klasse)
+        utan = e.klasse < 0
+        for sats in np.unique(e.promillesats[utan]):
+            legg_til(utan & (e.promillesats == sats), float(sats), None)
+        self.grupper = grupper
+
+    def total(self, bolig_sats, naering_sats, bunnfradrag, andre=None):
+        """Total skatt i kr (float). Argumenta kan vere tabellar som kringkastar.
+
+        `andre` er {klasse: sats} for andre klassar; elles gjeld satsen i lista.
+        """
+        andre = andre or {}
+        if np.ndim(bolig_sats) == np.ndim(naering_sats) == np.ndim(bunnfradrag) == 0:
+            return self._total_skalar(float(bolig_sats), float(naering_sats), float(bunnfradrag), andre)
+
+        satsar = {"bolig": np.asarray(bolig_sats, dtype=float),
+                  "naering": np.asarray(naering_sats, dtype=float),
+                  **{k: np.float64(v) for k, v in andre.items()}}
+        bunnfradrag = np.asarray(bunnfradrag, dtype=float)
+        total = 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for g in self.grupper:
+                r = satsar.get(g.klasse, np.float64(g.sats))
+                b = bunnfradrag if g.nytt_bunnfradrag else np.zeros_like(bunnfradrag)
+                terskel = b + MINSTE_SKATT * 1000 / r
+                k = np.searchsorted(g.grunnlag, terskel, side="left")
+                antal = len(g.grunnlag) - k
+                sum_grunnlag = g.prefiks[-1] - g.prefiks[k]
+                bidrag = (sum_grunnlag - antal * b) * (r / 1000)
+                total = total + np.where(r > 0, bidrag, 0.0)
+        return total
+
+    def _total_skalar(self, bolig_sats, naering_sats, bunnfradrag, andre):
+        # same som over utan tabell-overhead, for slider-oppslag
+        satsar = {"bolig": bolig_sats, "naering": naering_sats, **andre}
+        total = 0.0
+        for g in self.grupper:
+            r = satsar.get(g.klasse, g.sats)
+            if r <= 0:
+                continue
+            b = bunnfradrag if g.nytt_bunnfradrag else 0.0
+            k = int(g.grunnlag.searchsorted(b + MINSTE_SKATT * 1000 / r))
+            total += (float(g.prefiks[-1] - g.prefiks[k]) - (len(g.grunnlag) - k) * b) * (r / 1000)
+        return total
+
+    def bolig_sats_for(self, mål, naering_sats, bunnfradrag, andre=None, maks=BOLIG_SATSAR[-1]):
+        """Lågaste bolig-sats i [0, maks] som gir minst `mål` kr, med bisection.
+
+        `mål` og `bunnfradrag` kan vere tabellar, så heile kurva av
+        (bunnfradrag, sats) med same inntekt blir løyst i same halveringar.
+        NaN der målet ikkje kan nåast.
+        """
+        return _bisekt(lambda x: self.total(x, naering_sats, bunnfradrag, andre), mål, 0.0, maks, aukande=True)
+
+    def bunnfradrag_for(self, mål, bolig_sats, naering_sats, andre=None, maks=BUNNFRADRAG[-1]):
+        """Høgaste botnfrådrag i [0, maks] som gir minst `mål` kr. NaN der målet ikkje kan nåast."""
+        return _bisekt(lambda x: self.total(bolig_sats, naering_sats, x, andre), mål, 0.0, maks, aukande=False)
+
+
+def _bisekt(f, mål, lo, hi, aukande, steg=BISEKSJON_STEG):
+    """Grensa i [lo, hi] der monotone f går over `mål`, elementvis.
+
+    For aukande f er det minste x med f(x) >= mål, for søkkande det største.
+    Kvar halvering er eitt kall til f for alle element.
+    """
+    mål = np.asarray(mål, dtype=float)
+    form = np.broadcast(mål, f(lo)).shape
+    lo = np.full(form, float(lo))
+    hi = np.full(form, float(hi))
+    nåbar = f(hi if aukande else lo) >= mål
+    for _ in range(steg):
+        midt = (lo + hi) / 2
+        ok = f(midt) >= mål
+        if aukande:
+            hi, lo = np.where(ok, midt, hi), np.where(ok, lo, midt)
+        else:
+            lo, hi = np.where(ok, midt, lo), np.where(ok, hi, midt)
+    svar = np.where(nåbar, hi if aukande else lo, np.nan)
+    return float(svar) if svar.ndim == 0 else svar
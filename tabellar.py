@@ -0,0 +1,146 @@
+"""Tabellane i app.py som reine funksjonar, utan Streamlit.
+
+Kvar funksjon returnerer rader (dict) i same format som appen viser, så
+dei kan målast og sjekkast utan å køyre sida.
+"""
+import numpy as np
+
+from budsjett import fordel, last_konfig
+from skattemotor import MINSTE_SKATT
+
+# Kvantila kjem frå sorterte takstar rekna ut éin gong per lasta liste
+PERCENTIL_NAMN = {
+    25: "Eigedom med låg takst",
+    50: "Eigedom med median takst",
+    75: "Eigedom med høg takst",
+    99: "Eigedom med svært høg takst",
+}
+
+# Tiltak og stillingar kjem frå data/budsjett.json (sjå budsjett.py)
+TILTAK, STILLINGAR = last_konfig()
+
+
+def beregn_skatt(takst, skattenivå, bunnfradrag, promille):
+    grunnlag = takst * (skattenivå / 100) - bunnfradrag
+    grunnlag = max(grunnlag, 0)
+    skatt = grunnlag * (promille / 1000)
+    return 0 if skatt < MINSTE_SKATT else skatt
+
+
+def typiske_eigedomar(fordeling, percentilar, sats_ny, bunnfradrag_ny):
+    """Rader med dagens og ny skatt for takstane ved `percentilar` (1–99) i `fordeling`."""
+    # eigedomar med standard botnfrådrag får det nye; andre held sitt
+    bunnfradrag_typisk_ny = bunnfradrag_ny if fordeling.nytt_bunnfradrag else fordeling.bunnfradrag
+    percentilar = sorted(percentilar)
+    rows = []
+
+    for p, takst in zip(percentilar, fordeling.kvantil(np.array(percentilar) / 100)):
+
+        # dagens satser, med det vanlegaste skattenivået og botnfrådraget i klassen
+        skatt_dagens = beregn_skatt(
+            takst=takst,
+            skattenivå=fordeling.skatteniva,
+            bunnfradrag=fordeling.bunnfradrag,
+            promille=fordeling.promillesats
+        )
+
+        # nye satser (basert på sliderne)
+        skatt_ny = beregn_skatt(
+            takst=takst,
+            skattenivå=fordeling.skatteniva,
+            bunnfradrag=bunnfradrag_typisk_ny,
+            promille=sats_ny
+        )
+
+        eom = (skatt_ny - skatt_dagens) / 12
+
+        rows.append({
+            "Takst-nivå": f"{PERCENTIL_NAMN.get(p, 'Eigedom')} ({p / 100:.2f}-percentil)",
+            "Takst": f"{takst:,.0f} kr",
+            "Skatt (dagens)": f"{skatt_dagens:,.0f} kr",
+            "Skatt (ny)":  f"{skatt_ny:,.0f} kr",
+            "Mogleg endring per mnd":  f"{eom:,.0f} kr"
+        })
+    return rows
+
+
+def tiltak_rader(midlar, tiltak=TILTAK, stillingar=STILLINGAR, prioritet=None):
+    """Tiltaka med om dei er med i den beste planen for `midlar` kr, og årsverka i planen.
+
+    Sjå budsjett.fordel for `prioritet`; som standard blir flest mogleg
+    tiltak valde og ingen stillingar.
+    """
+    plan = fordel(midlar, tiltak, stillingar, prioritet)
+    remaining = midlar
+    rows_tiltak = []
+
+    for namn, kostnad in tiltak.items():
+        if kostnad == 0:
+            kan = "ja (gratis)"
+        elif namn in plan.tiltak:
+            kan = "ja"
+            remaining -= kostnad
+        else:
+            kan = "nei"
+
+        rows_tiltak.append({
+            "Tiltak": namn,
+            "Kostnad": f"{kostnad:,.0f} kr",
+            "Har råd": kan,
+            "Gjenværende budsjett": f"{remaining:,.0f} kr"
+        })
+
+    for namn, antal in plan.årsverk.items():
+        kostnad = stillingar[namn] * antal
+        remaining -= kostnad
+        rows_tiltak.append({
+            "Tiltak": f"{antal} årsverk {namn.lower()}",
+            "Kostnad": f"{kostnad:,.0f} kr",
+            "Har råd": "ja",
+            "Gjenværende budsjett": f"{remaining:,.0f} kr"
+        })
+    return rows_tiltak
+
+
+def stillingar_rader(midlar, stillingar=STILLINGAR):
+    """Kor mange årsverk `midlar` kr rekk til for kvar stilling."""
+    rows_stilling = []
+    for kategori, løn in stillingar.items():
+        antal = midlar / løn
+        rows_stilling.append({
+            "Stilling": kategori,
+            "Årskostnad": f"{løn:,.0f} kr",
+            "Tal mogleg årsverk": round(antal, 1)
+        })
+    return rows_stilling
+
+
+def fargelegg(df, farge, kolonne):
+    """Styler for `df` der `farge` gir stilen til kvar celle i `kolonne`.
+
+    Styler.applymap er borte i pandas 3; Styler.map finst frå pandas 2.1.
+    """
+    stil = df.style
+    kart = stil.map if hasattr(stil, "map") else stil.applymap
+    return kart(farge, subset=[kolonne])
+
+
+def farge_neg_pos(val):
+    try:
+        clean = float(val.replace(" kr", "").replace(",", "").replace(" ", ""))
+    except:
+        return ""
+    if clean < 0:
+        return "background-color: #e6ffe6;"   # grøn
+    elif clean > 0:
+        return "background-color: #ffe6e6;"   # raud
+    return ""
+
+
+def farge_har_rad(val):
+    if isinstance(val, str):
+        if val.startswith("ja"):
+            return "background-color: #e5ffe5;"   # grøn
+        elif val == "nei":
+            return "background-color: #ffe5e5;"   # raud
+    return ""
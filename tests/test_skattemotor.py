@@ -0,0 +1,131 @@
+"""Regresjonstestar for skattemotoren, budsjettet og framlegga, utan Streamlit og utan lista.
+
+Testane brukar ei lita syntetisk liste, så dei kan køyrast utan CSV eller PDF:
+
+    python -m pytest -q
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from budsjett import fordel
+from framlegg import MAKS_BOLIG, MAKS_BUNNFRADRAG, MAKS_SATS, frå_tekst, til_tekst
+from skattemotor import (BOLIG_SATSAR, BUNNFRADRAG, NAERING_SATSAR, Eigedomar, Grunnlagsindeks,
+                         Politikk, berekn_kube, skatt_per_eigedom, total_skatt)
+
+POLITIKKAR = [
+    Politikk(1.9, 4.0, 200_000),
+    Politikk(1.8, 4.0, 200_000),
+    Politikk(2.9, 5.0, 1_200_000),
+    Politikk(0.0, 7.0, 0),
+    Politikk(4.0, 0.0, 2_000_000),
+    Politikk(1.85, 4.3, 250_000),   # utanfor rutenettet
+]
+
+
+@pytest.fixture(scope="module")
+def df():
+    """Konvertert skatteliste med bolig, næring, rader med eigen sats og ulike frådrag."""
+    rng = np.random.default_rng(2025)
+    n = 600
+    return pd.DataFrame({
+        "Takst": np.round(rng.lognormal(14.5, 1.0, n), -3),
+        "Skattenivå": rng.choice([70.0, 100.0], n),
+        "Bunnfradrag": rng.choice([0.0, 200_000.0, 100_000.0], n, p=[0.3, 0.6, 0.1]),
+        "Promillesats": rng.choice([1.9, 4.0, 7.0], n, p=[0.7, 0.25, 0.05]),
+        "Fritak": rng.choice(["ingen", "§ 5 h delvis", ""], n, p=[0.9, 0.05, 0.05]),
+    })
+
+
+@pytest.fixture(scope="module")
+def eigedomar(df):
+    return Eigedomar.frå_df(df)
+
+
+def gammal_skatt(df, politikk):
+    """Formelen app.py brukte før skattemotoren, med pandas."""
+    df = df.copy()
+    df["Promillesats_ny"] = df["Promillesats"]
+    df.loc[df["Promillesats"] == 1.9, "Promillesats_ny"] = politikk.bolig_sats
+    df.loc[df["Bunnfradrag"] == 200000, "Bunnfradrag_ny"] = politikk.bunnfradrag
+    df.loc[df["Bunnfradrag"] != 200000, "Bunnfradrag_ny"] = df["Bunnfradrag"]
+    df.loc[df["Promillesats"] == 4.0, "Promillesats_ny"] = politikk.naering_sats
+    df["Grunnlag_ny"] = df["Takst"] * (df["Skattenivå"] / 100) - df["Bunnfradrag_ny"]
+    df["Grunnlag_ny"] = df["Grunnlag_ny"].clip(lower=0)
+    df["Skatt_ny"] = df["Grunnlag_ny"] * (df["Promillesats_ny"] / 1000)
+    df.loc[df["Skatt_ny"] < 300, "Skatt_ny"] = 0
+    return df["Skatt_ny"].fillna(0).replace([np.inf, -np.inf], 0).round(0).astype(int).to_numpy()
+
+
+@pytest.mark.parametrize("politikk", POLITIKKAR)
+def test_skatt_per_eigedom_som_gammal_formel(df, eigedomar, politikk):
+    np.testing.assert_array_equal(skatt_per_eigedom(eigedomar, politikk), gammal_skatt(df, politikk))
+
+
+def test_inntektskube_som_total_skatt(eigedomar):
+    kube = berekn_kube(eigedomar)
+    for b, n, f in itertools.product(BOLIG_SATSAR[::8], NAERING_SATSAR[::10], BUNNFRADRAG[::5]):
+        assert kube.total(b, n, f) == total_skatt(eigedomar, Politikk(float(b), float(n), float(f)))
+    with pytest.raises(ValueError):
+        kube.total(1.85, 4.0, 200_000)
+
+
+@pytest.mark.parametrize("politikk", POLITIKKAR)
+def test_grunnlagsindeks_som_total_skatt(eigedomar, politikk):
+    indeks = Grunnlagsindeks(eigedomar)
+    betalar = (skatt_per_eigedom(eigedomar, politikk) > 0).sum()
+    total = indeks.total(politikk.bolig_sats, politikk.naering_sats, politikk.bunnfradrag)
+    # ikkje avrunda per eigedom: inntil 0,5 kr per eigedom som betaler skatt
+    assert abs(total - total_skatt(eigedomar, politikk)) <= 0.5 * betalar + 1e-6
+
+
+def test_grunnlagsindeks_finn_bolig_sats(eigedomar):
+    indeks = Grunnlagsindeks(eigedomar)
+    mål = total_skatt(eigedomar, Politikk(1.9, 4.0, 200_000))
+    sats = float(indeks.bolig_sats_for(mål, 4.0, 400_000))
+    assert indeks.total(sats, 4.0, 400_000) >= mål
+    assert indeks.total(sats - 0.001, 4.0, 400_000) < mål
+
+
+TILTAK = {"Bibliotek": 400_000, "Skulebuss": 250_000, "Lysløype": 120_000, "Benkar": 0}
+STILLINGAR = {"Lærar": 700_000, "Helsesjukepleiar": 750_000}
+
+
+def test_fordel_innanfor_budsjett_og_best():
+    for midlar in (0, 100_000, 500_000, 1_000_000, 3_000_000):
+        plan = fordel(midlar, TILTAK, STILLINGAR)
+        assert plan.kostnad <= midlar
+        assert plan.rest == midlar - plan.kostnad
+        assert "Benkar" in plan.tiltak   # gratis tiltak er alltid med
+        # tiltak har prioritet 1 og stillingar 0: planen tek flest mogleg tiltak
+        kostnad = [kr for kr in TILTAK.values() if kr > 0]
+        flest = max(k for k in range(len(kostnad) + 1)
+                    for val in itertools.combinations(kostnad, k) if sum(val) <= midlar)
+        assert len([t for t in plan.tiltak if TILTAK[t] > 0]) == flest
+        assert plan.årsverk == {}
+
+
+def test_fordel_prioritet():
+    prioritet = {"Lærar": 3, "Bibliotek": 1, "Skulebuss": 0}
+    plan = fordel(1_500_000, TILTAK, STILLINGAR, prioritet)
+    assert plan.årsverk == {"Lærar": 2}
+    assert "Skulebuss" not in plan.tiltak
+    assert plan.kostnad == 1_400_000
+
+
+@pytest.mark.parametrize("politikk", POLITIKKAR + [Politikk(2.1, 4.0, 400_000, satsar=(("verk_og_bruk", 6.5),))])
+def test_framlegg_tur_retur(politikk):
+    namn, tilbake = frå_tekst(til_tekst("Mitt framlegg", politikk))
+    assert namn == "Mitt framlegg"
+    assert tilbake == politikk
+
+
+def test_framlegg_grenser():
+    _, p = frå_tekst("Høg:1e9,99,5e9,verk_og_bruk=70")
+    assert (p.bolig_sats, p.naering_sats, p.bunnfradrag) == (MAKS_BOLIG, MAKS_SATS, MAKS_BUNNFRADRAG)
+    assert p.satsar == (("verk_og_bruk", MAKS_SATS),)
+    for tekst in ("Utan tal", "X:1,2", "X:a,4,0", "X:-1,4,0", "X:1,4,0,bolig=3", ":1,4,0"):
+        with pytest.raises(ValueError):
+            frå_tekst(tekst)
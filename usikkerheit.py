@@ -0,0 +1,132 @@
+"""Monte Carlo-simulering av usikkerheita i total skatt.
+
+Tre kjelder til usikkerheit blir trekte på nytt i kvar replika:
+
+* omtaksering: alle takstar blir gonga med ein felles faktor og ein
+  lognormal faktor per eigedom,
+* tolkefeil: rader der kontrollane i validering.py tyder på at
+  data/loaddata.py tolka rada feil (sjå MISTENKTE_KONTROLLAR); med sannsyn
+  `p_mistenkt` er dei verkelege bustader og får takst, skattenivå og
+  frådrag frå ein tilfeldig bolig, elles betaler dei ikkje skatt,
+* delvis fritak: for eigedomar med «delvis» fritak blir ein del av
+  grunnlaget, trekt uniformt i `delvis_fritak`, friteke.
+
+Replikaene blir rekna som tabellar (replika, eigedom) i blokker, og
+blokkene kan fordelast på fleire prosessar. Kor mange replikaer ei blokk
+har, blir valt ut frå MINNE_PER_BLOKK og talet på rader (sjå blokkstorleik).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from skattemotor import MINSTE_SKATT, satsar_per_rad
+from validering import BIT
+
+BLOKK = 256                # flest replikaer per blokk
+MINNE_PER_BLOKK = 2**28    # byte ei blokk kan bruke på tabellane sine
+TABELLAR_PER_BLOKK = 6     # float64-tabellar på replikaer * rader som _blokk held samstundes, om lag
+REPLIKAER = 2000
+
+# Kontrollar i validering.py som tyder på at rada vart feil tolka frå PDF-en
+MISTENKTE_KONTROLLAR = ("lag_takst", "tomt_felt", "ikkje_tal")
+
+
+def mistenkte(feil):
+    """Boolsk tabell for rader der bitmaska `feil` (kolonnen "Feil") har ein av MISTENKTE_KONTROLLAR."""
+    maske = np.bitwise_or.reduce([BIT[k] for k in MISTENKTE_KONTROLLAR])
+    return (np.asarray(feil) & maske) != 0
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Parametrane til simuleringa. Takstendringar er relative, 0.1 er +10 %."""
+    omtaksering: float = 0.0
+    omtaksering_sd: float = 0.0
+    individ_sd: float = 0.0
+    p_mistenkt: float = 0.5
+    delvis_fritak: tuple = (0.0, 1.0)
+
+
+@dataclass(frozen=True, eq=False)
+class Simulering:
+    """Total skatt i kr for kvar replika, sortert."""
+    totalar: np.ndarray
+
+    def intervall(self, nivå=0.95):
+        """Kvantilintervall (lo, hi) som dekkjer `nivå` av replikaene."""
+        lo, hi = np.quantile(self.totalar, [(1 - nivå) / 2, (1 + nivå) / 2])
+        return float(lo), float(hi)
+
+    @property
+    def median(self):
+        return float(np.median(self.totalar))
+
+    def del_over(self, grense):
+        """Del av replikaene med total over `grense`."""
+        return float((self.totalar > grense).mean())
+
+
+def _blokk(eigedomar, mistenkt, delvis, politikk, scenario, replikaer, seed):
+    """Totalar for `replikaer` replikaer med eigen tilfeldig straum."""
+    rng = np.random.default_rng(seed)
+    e = eigedomar
+    n = len(e)
+    promille, bunn, niva = satsar_per_rad(e, politikk)
+    promille_bolig = np.where(e.er_bolig, promille, politikk.bolig_sats)
+    bustader = np.flatnonzero(e.er_bolig)
+
+    faktor = 1 + scenario.omtaksering + scenario.omtaksering_sd * rng.standard_normal((replikaer, 1))
+    if scenario.individ_sd:
+        faktor = faktor * rng.lognormal(-scenario.individ_sd ** 2 / 2, scenario.individ_sd, (replikaer, n))
+    faktor = np.maximum(faktor, 0)
+    grunnlag = (e.takst * (niva / 100)) * faktor - bunn
+    sats = np.broadcast_to(promille, (replikaer, n))
+
+    # mistenkte rader er med som ein tilfeldig bolig med sannsyn p_mistenkt
+    m = np.flatnonzero(mistenkt)
+    if len(m) and len(bustader):
+        sats = sats.copy()
+        med = rng.random((replikaer, len(m))) < scenario.p_mistenkt
+        donor = bustader[rng.integers(len(bustader), size=(replikaer, len(m)))]
+        f = faktor if faktor.shape[1] == 1 else faktor[:, m]
+        grunnlag[:, m] = e.takst[donor] * f * (niva[donor] / 100) - bunn[donor]
+        sats[:, m] = np.where(med, promille_bolig[donor], 0.0)
+    np.maximum(grunnlag, 0, out=grunnlag)
+
+    d = np.flatnonzero(delvis)
+    if len(d):
+        lo, hi = scenario.delvis_fritak
+        grunnlag[:, d] *= 1 - rng.uniform(lo, hi, (replikaer, len(d)))
+
+    skatt = grunnlag * (sats / 1000)
+    skatt[skatt < MINSTE_SKATT] = 0
+    return np.round(skatt).sum(axis=1)
+
+
+def blokkstorleik(rader):
+    """Replikaer per blokk for `rader` eigedomar, innanfor MINNE_PER_BLOKK og høgst BLOKK."""
+    return int(np.clip(MINNE_PER_BLOKK // (8 * TABELLAR_PER_BLOKK * max(rader, 1)), 1, BLOKK))
+
+
+def simuler(eigedomar, mistenkt, delvis, politikk, scenario=None, replikaer=REPLIKAER,
+            seed=0, prosessar=1):
+    """Trekk `replikaer` totalar for `politikk` under `scenario` (standard Scenario()).
+
+    `mistenkt` og `delvis` er boolske tabellar per rad. Med same `seed` blir
+    svaret det same uansett tal på prosessar.
+    """
+    if scenario is None:
+        scenario = Scenario()
+    blokk = blokkstorleik(len(eigedomar))
+    storleikar = [min(blokk, replikaer - s) for s in range(0, replikaer, blokk)]
+    frø = np.random.SeedSequence(seed).spawn(len(storleikar))
+    args = [(eigedomar, mistenkt, delvis, politikk, scenario, r, f) for r, f in zip(storleikar, frø)]
+    if prosessar > 1 and len(args) > 1:
+        with ProcessPoolExecutor(prosessar) as pool:
+            delar = list(pool.map(_blokk, *zip(*args)))
+    else:
+        delar = [_blokk(*a) for a in args]
+    totalar = np.sort(np.concatenate(delar)) if delar else np.zeros(0)
+    totalar.setflags(write=False)
+    return Simulering(totalar)
@@ -0,0 +1,84 @@
+"""Kontroll av skattelista: felt som ikkje er tal, avvik i Grunnlag og Skatt, doble rader.
+
+Kontrollane blir køyrde éin gong når lista blir konvertert (sjå
+skattedata.konverter), og resultatet blir lagra som bitmaske i kolonnen
+"Feil", så appen berre les ei ferdig maske.
+
+Lista reknar Grunnlag = Takst * Skattenivå / 100 - Bunnfradrag og
+Skatt = Grunnlag * Promillesats / 1000 runda ned, utan minstegrense.
+"""
+import numpy as np
+import pandas as pd
+
+TOLERANSE = 1        # kr avvik som blir godteke i Grunnlag og Skatt
+MIN_TAKST = 1000     # lågare takst er truleg ein bit av matrikkelnummeret, t.d. "01"
+
+# bit i "Feil" -> skildring; rekkjefølgja er lagra i artefakta og skal ikkje endrast
+KONTROLLAR = {
+    "ikkje_tal": "talfelt med teikn som ikkje er tal",
+    "tomt_felt": "tomt talfelt",
+    "lag_takst": f"takst under {MIN_TAKST} kr",
+    "grunnlag_avvik": "Grunnlag stemmer ikkje med takst, skattenivå og frådrag",
+    "skatt_avvik": "Skatt stemmer ikkje med Grunnlag og promillesats",
+    "dobbel_eiendom": "same matrikkelnummer, adresse og sats på fleire rader",
+}
+BIT = {namn: np.uint16(1 << i) for i, namn in enumerate(KONTROLLAR)}
+
+
+def grunnlag_rekna(df):
+    """Grunnlag rekna frå Takst, Skattenivå og Bunnfradrag (float)."""
+    takst = df["Takst"].to_numpy(dtype=float)
+    niva = df["Skattenivå"].to_numpy(dtype=float)
+    return np.maximum(takst * niva / 100 - df["Bunnfradrag"].to_numpy(dtype=float), 0)
+
+
+def skatt_rekna(df):
+    """Skatt rekna frå publisert Grunnlag og Promillesats, runda ned som i lista."""
+    return np.floor(df["Grunnlag"].to_numpy(dtype=float) * df["Promillesats"].to_numpy(dtype=float) / 1000)
+
+
+def valider(tekst, df):
+    """Bitmaske (uint16) per rad.
+
+    `tekst` er talkolonnane slik dei stod i CSV-en, `df` same rader etter
+    konvertering til tal.
+    """
+    feil = np.zeros(len(df), dtype=np.uint16)
+    for col in tekst.columns:
+        s = tekst[col]
+        tom = (s.isna() | (s.astype(str).str.strip() == "")).to_numpy()
+        ugyldig = ~tom & s.astype(str).str.contains(r"[^0-9\s,.]", regex=True).to_numpy()
+        feil[tom] |= BIT["tomt_felt"]
+        feil[ugyldig] |= BIT["ikkje_tal"]
+
+    takst = df["Takst"].to_numpy(dtype=float)
+    feil[(takst > 0) & (takst < MIN_TAKST)] |= BIT["lag_takst"]
+    grunnlag = df["Grunnlag"].to_numpy(dtype=float)
+    feil[np.abs(grunnlag - grunnlag_rekna(df)) > TOLERANSE] |= BIT["grunnlag_avvik"]
+    skatt = df["Skatt"].to_numpy(dtype=float)
+    feil[np.abs(skatt - skatt_rekna(df)) > TOLERANSE] |= BIT["skatt_avvik"]
+    # same matrikkelnummer åleine er vanleg (bolig- og næringsdel, fleire bygg)
+    feil[df.duplicated(["Eiendom", "Adresse", "Promillesats"], keep=False).to_numpy()] |= BIT["dobbel_eiendom"]
+    return feil
+
+
+def tal_per_kontroll(feil):
+    """{kontroll: tal rader} for kontrollar som slår ut."""
+    tal = {namn: int(((feil & bit) != 0).sum()) for namn, bit in BIT.items()}
+    return {namn: n for namn, n in tal.items() if n}
+
+
+def rapport(df):
+    """Rader med feil, med kva kontrollar som slo ut og dei utrekna verdiane."""
+    feil = df["Feil"].to_numpy()
+    rader = np.flatnonzero(feil)
+    return pd.DataFrame({
+        "Rad": rader + 2,   # linjenummer i CSV-en, med overskrifta
+        "Eiendom": df["Eiendom"].to_numpy()[rader],
+        "Adresse": df["Adresse"].to_numpy()[rader],
+        "Feil": [", ".join(n for n, bit in BIT.items() if f & bit) for f in feil[rader]],
+        "Grunnlag": df["Grunnlag"].to_numpy()[rader],
+        "Grunnlag rekna": grunnlag_rekna(df)[rader].round(),
+        "Skatt": df["Skatt"].to_numpy()[rader],
+        "Skatt rekna": skatt_rekna(df)[rader],
+    })